@@ -0,0 +1,90 @@
+"""
+Reverse index benchmark: "which roles can call iam:PassRole" over a fleet of
+role policies, by scanning every expanded policy against ActionIndex lookups.
+
+    pip install -e . && python benchmarks/bench_action_index.py
+"""
+import time
+import timeit
+
+from policyuniverse.action_index import ActionIndex
+from policyuniverse.policy import Policy
+
+SERVICES = ["s3", "ec2", "sqs", "sns", "kms", "dynamodb", "lambda", "logs"]
+
+
+def role_policy(n):
+    service = SERVICES[n % len(SERVICES)]
+    statements = [
+        {
+            "Effect": "Allow",
+            "Action": ["{}:Get*".format(service), "{}:List*".format(service)],
+        },
+        {
+            "Effect": "Allow",
+            "Action": ["{}:Put*".format(SERVICES[(n + 1) % len(SERVICES)])],
+        },
+    ]
+    if n % 10 == 0:
+        statements.append(
+            {"Effect": "Allow", "Action": ["iam:PassRole", "ec2:RunInstances"]}
+        )
+    if n % 50 == 0:
+        statements.append(
+            {"Effect": "Allow", "NotAction": ["iam:*", "organizations:*"]}
+        )
+    if n % 100 == 0:
+        statements.append({"Effect": "Deny", "Action": "iam:PassRole"})
+    return {"Statement": statements}
+
+
+def scan(policies, action):
+    keys = set()
+    for key, policy in policies.items():
+        allowed = denied = False
+        for statement in policy.statements:
+            if action in statement.action_set:
+                allowed |= statement.effect == "Allow"
+                denied |= statement.effect == "Deny"
+        if allowed and not denied:
+            keys.add(key)
+    return keys
+
+
+def main(count=40000, number=5):
+    policies = dict(("role-{}".format(n), Policy(role_policy(n))) for n in range(count))
+
+    start = time.perf_counter()
+    index = ActionIndex(policies)
+    print(
+        "build index ({} roles)   {:8.1f} ms".format(
+            count, (time.perf_counter() - start) * 1000
+        )
+    )
+
+    assert scan(policies, "iam:passrole") == index.who_can("iam:passrole")
+    cases = [
+        ("linear scan", lambda: scan(policies, "iam:passrole")),
+        ("who_can", lambda: index.who_can("iam:passrole")),
+        ("policies('kms:*')", lambda: index.policies("kms:*")),
+        (
+            "kms Permissions category",
+            lambda: index.policies_for_category("Permissions", "kms"),
+        ),
+    ]
+    for label, func in cases:
+        best = min(timeit.repeat(func, number=number, repeat=3)) / number
+        print("{:<26} {:8.3f} ms".format(label, best * 1000))
+
+    start = time.perf_counter()
+    for n in range(0, count, 100):
+        index.add("role-{}".format(n), Policy(role_policy(n + 1)))
+    print(
+        "re-index {} roles        {:8.1f} ms".format(
+            count // 100, (time.perf_counter() - start) * 1000
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
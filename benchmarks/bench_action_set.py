@@ -0,0 +1,43 @@
+"""
+NotAction / set-algebra benchmark: plain string sets against ActionSet bitmaps.
+
+    pip install -e . && python benchmarks/bench_action_set.py
+"""
+import timeit
+
+from policyuniverse.catalog import get_catalog
+from policyuniverse.expander_minimizer import (
+    _expand_wildcard_action,
+    get_action_set_from_statement,
+    get_actions_from_statement,
+)
+
+STATEMENT = {
+    "Effect": "Allow",
+    "NotAction": ["iam:*", "organizations:*", "account:*", "sts:*"],
+    "Resource": "*",
+}
+
+
+def string_sets(statement):
+    """The set-of-strings implementation get_actions_from_statement used to have."""
+    inverted = set()
+    for action in statement["NotAction"]:
+        inverted = inverted.union(set(_expand_wildcard_action(action)))
+    return get_catalog().permissions.difference(inverted)
+
+
+def main(number=50):
+    get_catalog()
+    cases = [
+        ("string sets", lambda: string_sets(STATEMENT)),
+        ("ActionSet", lambda: get_action_set_from_statement(STATEMENT)),
+        ("ActionSet -> set", lambda: get_actions_from_statement(STATEMENT)),
+    ]
+    for label, func in cases:
+        best = min(timeit.repeat(func, number=number, repeat=5)) / number
+        print("{:<20} {:8.3f} ms".format(label, best * 1000))
+
+
+if __name__ == "__main__":
+    main()
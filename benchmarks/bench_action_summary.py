@@ -0,0 +1,62 @@
+"""
+Action summary benchmark: categories from per-action bit iteration against
+the catalog's per-service category histograms and masks.
+
+    pip install -e . && python benchmarks/bench_action_summary.py
+"""
+import timeit
+from collections import defaultdict
+
+from policyuniverse.action import iter_bits
+from policyuniverse.action_categories import categories_for_actions
+from policyuniverse.catalog import get_catalog
+from policyuniverse.expander_minimizer import get_action_set_from_statement
+
+STATEMENTS = [
+    {"Action": "s3:*"},
+    {"Action": "ec2:Describe*"},
+    {"Action": "*"},
+    {"NotAction": ["iam:*", "organizations:*"]},
+]
+
+
+def per_action(action_set):
+    """The bit-by-bit _categories_for_action_set this replaces."""
+    catalog = action_set.catalog
+    categories = catalog.categories
+    category_names = catalog.category_names
+    bits = action_set.bits
+
+    groups = defaultdict(set)
+    for service, (start, end) in catalog.services.items():
+        service_bits = bits >> start & ((1 << (end - start)) - 1)
+        if service_bits:
+            groups[service] = set(
+                [category_names[categories[start + i]] for i in iter_bits(service_bits)]
+            )
+    return groups
+
+
+def main(number=20):
+    catalog = get_catalog()
+    catalog.category_masks
+    for statement in STATEMENTS:
+        action_set = get_action_set_from_statement(statement)
+        assert per_action(action_set) == categories_for_actions(action_set)
+        old = min(
+            timeit.repeat(lambda: per_action(action_set), number=number, repeat=3)
+        )
+        new = min(
+            timeit.repeat(
+                lambda: categories_for_actions(action_set), number=number, repeat=3
+            )
+        )
+        print(
+            "{:<45} per action {:8.3f} ms   histograms {:8.3f} ms".format(
+                str(statement), old / number * 1000, new / number * 1000
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+ARN parsing benchmark over the handful of principals that repeat across a
+fleet's policies: ARN(raw) every time against the ARN.parse intern cache and
+the columnar parse_many.
+
+    pip install -e . && python benchmarks/bench_arn.py
+"""
+import timeit
+
+from policyuniverse.arn import ARN, parse_many
+from policyuniverse.policy import Policy
+
+PRINCIPALS = (
+    ["arn:aws:iam::{:012d}:root".format(n) for n in range(40)]
+    + ["{}.amazonaws.com".format(s) for s in ["lambda", "s3", "sns", "events", "logs"]]
+    + ["arn:aws:iam::{:012d}:role/deploy".format(n) for n in range(20)]
+    + ["*"]
+)
+RAW = PRINCIPALS * 200
+
+POLICIES = [
+    {
+        "Statement": [
+            {
+                "Effect": "Allow",
+                "Principal": {"AWS": [PRINCIPALS[start + i] for i in range(3)]},
+                "Action": "sts:AssumeRole",
+            }
+        ]
+    }
+    for start in [n % 60 for n in range(2000)]
+]
+
+
+def main(number=10):
+    cases = [
+        ("ARN(raw)", lambda: [ARN(raw) for raw in RAW]),
+        ("ARN.parse(raw)", lambda: [ARN.parse(raw) for raw in RAW]),
+        ("parse_many(raws)", lambda: parse_many(RAW)),
+        (
+            "Policy.is_internet_accessible",
+            lambda: [Policy(p).is_internet_accessible() for p in POLICIES],
+        ),
+    ]
+    for label, func in cases:
+        best = min(timeit.repeat(func, number=number, repeat=5)) / number
+        print("{:<32} {:8.3f} ms".format(label, best * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Bulk analysis scaling benchmark: policyuniverse.bulk.analyze at 1, 2, 4 and 8
+worker processes against the serial fallback.
+
+    pip install -e . && python benchmarks/bench_bulk.py
+"""
+import timeit
+
+from policyuniverse.bulk import analyze
+
+SERVICES = ["s3", "ec2", "iam", "sqs", "sns", "kms", "dynamodb", "lambda"]
+
+
+def make_policies(count):
+    policies = []
+    for index in range(count):
+        service = SERVICES[index % len(SERVICES)]
+        policies.append(
+            {
+                "Version": "2012-10-17",
+                "Statement": [
+                    {
+                        "Effect": "Allow",
+                        "Principal": {
+                            "AWS": "arn:aws:iam::{:012d}:root".format(index % 997)
+                        },
+                        "Action": [
+                            "{}:Get*".format(service),
+                            "{}:List*".format(service),
+                        ],
+                        "Resource": "*",
+                        "Condition": {
+                            "IpAddress": {
+                                "aws:SourceIp": "10.{}.0.0/16".format(index % 256)
+                            },
+                            "StringEquals": {"aws:PrincipalOrgID": "o-abcdefghij"},
+                        },
+                    },
+                    {
+                        "Effect": "Allow",
+                        "Principal": "*",
+                        "NotAction": "{}:*".format(service),
+                        "Resource": "*",
+                    },
+                ],
+            }
+        )
+    return policies
+
+
+def main(count=5000):
+    policies = make_policies(count)
+    serial = list(analyze(policies, workers=0))
+    for workers in [0, 1, 2, 4, 8]:
+        assert list(analyze(policies, workers=workers)) == serial
+        best = min(
+            timeit.repeat(
+                lambda: list(analyze(policies, workers=workers)), number=1, repeat=3
+            )
+        )
+        label = "serial" if workers == 0 else "{} workers".format(workers)
+        print(
+            "{:<12} {:8.1f} ms  {:8.0f} policies/s".format(
+                label, best * 1000, count / best
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Condition extraction microbenchmark over condition-heavy S3 and KMS resource
+policies: the per-call key table and regexes Statement used to build against
+the module-level operator table.
+
+    pip install -e . && python benchmarks/bench_conditions.py
+"""
+import re
+import timeit
+
+from policyuniverse.common import is_array
+from policyuniverse.statement import ConditionTuple, Statement
+
+
+def s3_statement(n):
+    return {
+        "Effect": "Allow",
+        "Principal": "*",
+        "Action": ["s3:GetObject", "s3:PutObject"],
+        "Resource": "arn:aws:s3:::bucket-{}/*".format(n),
+        "Condition": {
+            "StringEquals": {
+                "aws:PrincipalOrgID": "o-abcdefghij",
+                "s3:x-amz-acl": "bucket-owner-full-control",
+            },
+            "ArnLike": {
+                "aws:SourceArn": "arn:aws:cloudtrail:*:{:012d}:trail/*".format(n)
+            },
+            "IpAddress": {
+                "aws:SourceIp": ["10.0.0.0/8", "192.168.{}.0/24".format(n % 256)]
+            },
+            "Bool": {"aws:SecureTransport": "true"},
+            "StringNotEquals": {"aws:SourceVpce": "vpce-{:08x}".format(n)},
+        },
+    }
+
+
+def kms_statement(n):
+    return {
+        "Effect": "Allow",
+        "Principal": {"AWS": "*"},
+        "Action": ["kms:Decrypt", "kms:GenerateDataKey*"],
+        "Resource": "*",
+        "Condition": {
+            "StringEquals": {
+                "kms:CallerAccount": "{:012d}".format(n),
+                "kms:ViaService": "s3.us-east-1.amazonaws.com",
+            },
+            "ForAnyValue:StringLike": {
+                "aws:PrincipalOrgPaths": ["o-a/r-ab12/ou-ab12-*"]
+            },
+            "StringEqualsIfExists": {"aws:SourceVpc": "vpc-{:08x}".format(n)},
+            "NumericLessThan": {"aws:MultiFactorAuthAge": "3600"},
+        },
+    }
+
+
+STATEMENTS = [s3_statement(n) for n in range(500)] + [
+    kms_statement(n) for n in range(500)
+]
+
+
+def legacy_condition_entries(statement):
+    """What Statement._condition_entries did before the operator table."""
+    conditions = list()
+    condition = statement.get("Condition")
+    if not condition:
+        return conditions
+
+    key_mapping = {
+        "aws:sourcearn": "arn",
+        "aws:principalarn": "arn",
+        "aws:sourceowner": "account",
+        "aws:sourceaccount": "account",
+        "aws:principalaccount": "account",
+        "aws:principalorgid": "organization",
+        "aws:principalorgpaths": "organization",
+        "kms:calleraccount": "account",
+        "aws:userid": "userid",
+        "aws:sourceip": "cidr",
+        "aws:sourcevpc": "vpc",
+        "aws:sourcevpce": "vpce",
+        "saml:aud": "saml-endpoint",
+    }
+
+    relevant_condition_operators = [
+        re.compile(
+            "((ForAllValues|ForAnyValue):)?ARN(Equals|Like)(IfExists)?",
+            re.IGNORECASE,
+        ),
+        re.compile(
+            "((ForAllValues|ForAnyValue):)?String(Equals|Like)(IgnoreCase)?(IfExists)?",
+            re.IGNORECASE,
+        ),
+        re.compile("((ForAllValues|ForAnyValue):)?IpAddress(IfExists)?", re.IGNORECASE),
+    ]
+
+    for condition_operator in condition.keys():
+        if any(
+            regex.match(condition_operator) for regex in relevant_condition_operators
+        ):
+            for key, value in condition[condition_operator].items():
+                if key.lower() in key_mapping:
+                    if is_array(value):
+                        for v in value:
+                            conditions.append(
+                                ConditionTuple(
+                                    value=v, category=key_mapping[key.lower()]
+                                )
+                            )
+                    else:
+                        conditions.append(
+                            ConditionTuple(
+                                value=value, category=key_mapping[key.lower()]
+                            )
+                        )
+    return conditions
+
+
+def main(number=20):
+    for statement in STATEMENTS:
+        assert (
+            tuple(legacy_condition_entries(statement))
+            == Statement(statement).condition_entries
+        )
+
+    cases = [
+        ("regexes per call", lambda: [legacy_condition_entries(s) for s in STATEMENTS]),
+        (
+            "operator table",
+            lambda: [Statement(s).condition_entries for s in STATEMENTS],
+        ),
+    ]
+    for label, func in cases:
+        best = min(timeit.repeat(func, number=number, repeat=5)) / number
+        print("{:<20} {:8.3f} us/statement".format(label, best / len(STATEMENTS) * 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Wildcard expansion benchmark: fnmatch.filter over every permission against the
+catalog's prefix index.
+
+    pip install -e . && python benchmarks/bench_expand.py
+"""
+import fnmatch
+import timeit
+
+from policyuniverse.catalog import get_catalog
+from policyuniverse.expander_minimizer import (
+    _expand_wildcard_action,
+    expand_actions,
+    expand_policy,
+    expansion_cache,
+)
+
+# Patterns lifted from typical managed and inline policies.
+POLICY_PATTERNS = [
+    ["s3:Get*", "s3:List*", "s3:PutObject", "s3:PutObjectAcl"],
+    ["ec2:Describe*", "elasticloadbalancing:Describe*", "autoscaling:Describe*"],
+    ["iam:Get*", "iam:List*", "iam:PassRole", "sts:AssumeRole"],
+    ["logs:*", "cloudwatch:*", "sns:Publish", "sqs:*Message*"],
+    ["kms:Decrypt", "kms:GenerateDataKey*", "kms:Describe*", "dynamodb:*Item"],
+    ["*"],
+]
+
+
+def fnmatch_expand(actions):
+    """The fnmatch-based _expand_wildcard_action this replaces."""
+    permissions = get_catalog().permissions
+    expanded = []
+    for action in actions:
+        matches = fnmatch.filter(permissions, action.lower())
+        expanded.extend(matches or [action])
+    return [item.lower() for item in expanded]
+
+
+# Roughly what one account's GetAccountAuthorizationDetails inline policies
+# add up to: the same handful of patterns over and over, plus a long tail of
+# service-specific ones.
+ACCOUNT_PATTERNS = [
+    pattern
+    for index in range(300)
+    for pattern in POLICY_PATTERNS[index % 5]
+    + [
+        "s3:*Object{}*".format("Acl" if index % 2 else "Tagging"),
+        "ec2:*{}*".format(["Volume", "Snapshot", "Image"][index % 3]),
+        "dynamodb:*{}".format(["Item", "Table"][index % 2]),
+    ]
+]
+
+
+def per_pattern(patterns):
+    expanded = set()
+    for pattern in patterns:
+        expanded.update(_expand_wildcard_action(pattern))
+    return expanded
+
+
+def uncached(func, patterns):
+    expansion_cache.clear()
+    return func(patterns)
+
+
+# A policy with the kind of Condition and Resource blocks deepcopy has to walk.
+POLICY = {
+    "Version": "2012-10-17",
+    "Statement": [
+        {
+            "Effect": "Allow",
+            "Action": patterns,
+            "Resource": ["arn:aws:s3:::bucket-{}/*".format(n) for n in range(20)],
+            "Condition": {
+                "StringEquals": {"aws:PrincipalOrgID": "o-abc123"},
+                "IpAddress": {
+                    "aws:SourceIp": ["10.0.{}.0/24".format(n) for n in range(20)]
+                },
+            },
+        }
+        for patterns in POLICY_PATTERNS[:5] * 4
+    ],
+}
+
+
+def main(number=20):
+    get_catalog()
+    for patterns in POLICY_PATTERNS:
+        assert sorted(fnmatch_expand(patterns)) == sorted(
+            _expand_wildcard_action(patterns)
+        )
+        old = min(
+            timeit.repeat(lambda: fnmatch_expand(patterns), number=number, repeat=3)
+        )
+        new = min(
+            timeit.repeat(
+                lambda: _expand_wildcard_action(patterns), number=number, repeat=3
+            )
+        )
+        print(
+            "{:<60} fnmatch {:8.3f} ms   index {:8.3f} ms".format(
+                ", ".join(patterns)[:60], old / number * 1000, new / number * 1000
+            )
+        )
+
+    assert per_pattern(ACCOUNT_PATTERNS) == expand_actions(ACCOUNT_PATTERNS)
+    print("\n{} patterns from one account:".format(len(ACCOUNT_PATTERNS)))
+    for label, func in [
+        ("per pattern", per_pattern),
+        ("expand_actions", expand_actions),
+    ]:
+        cold = min(
+            timeit.repeat(
+                lambda: uncached(func, ACCOUNT_PATTERNS), number=number, repeat=3
+            )
+        )
+        warm = min(
+            timeit.repeat(lambda: func(ACCOUNT_PATTERNS), number=number, repeat=3)
+        )
+        print(
+            "{:<20} cold cache {:8.3f} ms   warm cache {:8.3f} ms".format(
+                label, cold / number * 1000, warm / number * 1000
+            )
+        )
+
+    print("\nexpand_policy, {} statements:".format(len(POLICY["Statement"])))
+    for label, kwargs in [
+        ("deepcopy", {}),
+        ("shallow", {"shallow": True}),
+    ]:
+        best = min(
+            timeit.repeat(
+                lambda: expand_policy(POLICY, **kwargs), number=number, repeat=3
+            )
+        )
+        print("{:<20} {:8.3f} ms".format(label, best / number * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Import-time benchmark.
+
+Each measurement runs in a fresh interpreter so module caches don't hide the
+cost of loading the catalog.
+
+    pip install -e . && python benchmarks/bench_import.py
+"""
+import subprocess
+import sys
+import timeit
+
+CASES = [
+    ("import policyuniverse.arn", "import policyuniverse.arn"),
+    ("import policyuniverse.organization", "import policyuniverse.organization"),
+    ("import policyuniverse.policy", "import policyuniverse.policy"),
+    (
+        "first catalog access",
+        "from policyuniverse.catalog import get_catalog; get_catalog()",
+    ),
+]
+
+
+def _run(code):
+    subprocess.check_call([sys.executable, "-c", code])
+
+
+def main(repeat=5):
+    baseline = min(timeit.repeat(lambda: _run("pass"), number=1, repeat=repeat))
+    print("interpreter startup: {:.1f} ms".format(baseline * 1000))
+    for label, code in CASES:
+        best = min(timeit.repeat(lambda: _run(code), number=1, repeat=repeat))
+        print("{:<40} {:8.1f} ms".format(label, (best - baseline) * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Minimization benchmark on a 500-action statement: the denied-prefix-set
+algorithm minimize_statement_actions used to run against the prefix trie.
+
+    pip install -e . && python benchmarks/bench_minimize.py
+"""
+import contextlib
+import io
+import timeit
+
+from policyuniverse.catalog import get_catalog
+from policyuniverse.expander_minimizer import (
+    _get_desired_actions_from_statement,
+    _get_prefixes_for_action,
+    minimize_statement_actions,
+)
+
+
+def legacy_minimize(statement, minchars=None):
+    """minimize_statement_actions before the trie, minus the printing."""
+    desired_actions = _get_desired_actions_from_statement(statement)
+    denied_prefixes = set()
+    for denied_action in get_catalog().permissions.difference(desired_actions):
+        denied_prefixes.update(_get_prefixes_for_action(denied_action))
+
+    minimized_actions = set()
+    for action in desired_actions:
+        if action in denied_prefixes:
+            minimized_actions.add(action)
+            continue
+        prefixes = _get_prefixes_for_action(action)
+        for prefix in prefixes:
+            permission = prefix.split(":")[1]
+            if minchars and len(permission) < int(minchars) and permission != "":
+                continue
+            if prefix not in denied_prefixes:
+                if prefix not in desired_actions:
+                    prefix = "{}*".format(prefix)
+                minimized_actions.add(prefix)
+                break
+        else:
+            minimized_actions.add(prefixes[-1])
+    return sorted(minimized_actions)
+
+
+def statement_500():
+    actions = get_catalog().actions
+    # Whole services mixed with scattered single actions.
+    chosen = list(actions[:300:1]) + list(actions[1000::70])
+    return dict(Effect="Allow", Action=chosen[:500], Resource="*")
+
+
+def main(number=5):
+    get_catalog()
+    statement = statement_500()
+    print("{} actions".format(len(statement["Action"])))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        minimized = minimize_statement_actions(statement, minchars=3)
+        assert minimized == legacy_minimize(statement, minchars=3)
+        cases = [
+            ("denied prefixes", lambda: legacy_minimize(statement, minchars=3)),
+            ("trie", lambda: minimize_statement_actions(statement, minchars=3)),
+        ]
+        results = [
+            (label, min(timeit.repeat(func, number=number, repeat=3)) / number)
+            for label, func in cases
+        ]
+
+    print("minimized to {} entries".format(len(minimized)))
+    for label, best in results:
+        print("{:<20} {:10.3f} ms".format(label, best * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Result cache benchmark: analyzing a 50k-policy corpus with no cache, then with
+a cold and a warm ResultCache.  Like a fleet, the corpus is mostly the same
+few hundred documents with their keys and lists in different orders.
+
+    pip install -e . && python benchmarks/bench_result_cache.py
+"""
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from policyuniverse.bulk import analyze
+from policyuniverse.result_cache import ResultCache
+
+SERVICES = ["s3", "ec2", "iam", "sqs", "sns", "kms", "dynamodb", "lambda"]
+
+
+def template(n):
+    service = SERVICES[n % len(SERVICES)]
+    return {
+        "Version": "2012-10-17",
+        "Statement": [
+            {
+                "Sid": "Read",
+                "Effect": "Allow",
+                "Principal": {"AWS": ["arn:aws:iam::{:012d}:root".format(n), "*"]},
+                "Action": ["{}:Get*".format(service), "{}:List*".format(service)],
+                "Resource": "*",
+                "Condition": {
+                    "StringEquals": {"aws:PrincipalOrgID": "o-{:010d}".format(n)}
+                },
+            },
+            {"Effect": "Deny", "NotAction": "{}:*".format(service), "Resource": "*"},
+        ],
+    }
+
+
+def shuffled(document, rng):
+    statements = [
+        dict(rng.sample(list(s.items()), len(s))) for s in document["Statement"]
+    ]
+    rng.shuffle(statements)
+    return {"Statement": statements, "Version": document["Version"]}
+
+
+def main(count=50000, distinct=500):
+    rng = random.Random(0)
+    templates = [template(n) for n in range(distinct)]
+    corpus = [shuffled(templates[rng.randrange(distinct)], rng) for _ in range(count)]
+
+    directory = tempfile.mkdtemp()
+    try:
+        cache = ResultCache(os.path.join(directory, "results.db"))
+        runs = [("no cache", None), ("cold cache", cache), ("warm cache", cache)]
+        for label, run_cache in runs:
+            start = time.perf_counter()
+            for _ in analyze(corpus, workers=0, cache=run_cache):
+                pass
+            elapsed = time.perf_counter() - start
+            print(
+                "{:<12} {:8.2f} s  {:8.0f} policies/s".format(
+                    label, elapsed, count / elapsed
+                )
+            )
+        cache.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
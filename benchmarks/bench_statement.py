@@ -0,0 +1,75 @@
+"""
+Statement construction benchmark: time and memory per Statement, against the
+eager, __dict__-based Statement that computed everything up front.
+
+    pip install -e . && python benchmarks/bench_statement.py
+"""
+import timeit
+import tracemalloc
+
+from policyuniverse.statement import Statement
+
+DOCUMENTS = [
+    {
+        "Effect": "Allow",
+        "Principal": {"AWS": ["arn:aws:iam::{:012d}:root".format(n), "*"]},
+        "Action": ["s3:GetObject", "s3:ListBucket"],
+        "Resource": [
+            "arn:aws:s3:::bucket-{}".format(n),
+            "arn:aws:s3:::bucket-{}/*".format(n),
+        ],
+        "Condition": {
+            "StringEquals": {"aws:PrincipalOrgID": "o-abcdefghij"},
+            "IpAddress": {"aws:SourceIp": ["10.{}.0.0/16".format(n % 256)]},
+        },
+    }
+    for n in range(2000)
+]
+
+
+class EagerStatement(object):
+    """What Statement.__init__ used to do."""
+
+    _condition_entries = Statement._condition_entries
+    _principals = Statement._principals
+    _actions = Statement._actions
+    _add_or_extend = Statement._add_or_extend
+
+    def __init__(self, statement):
+        self.statement = statement
+        self.condition_entries = self._condition_entries()
+        self.principals = self._principals()
+        self.actions = self._actions()
+
+
+def memory_per_statement(cls):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    statements = [cls(document) for document in DOCUMENTS]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del statements
+    return (after - before) / len(DOCUMENTS)
+
+
+def main(number=20):
+    cases = [
+        ("eager", lambda: [EagerStatement(d) for d in DOCUMENTS]),
+        ("lazy", lambda: [Statement(d) for d in DOCUMENTS]),
+        ("lazy + effect", lambda: [Statement(d).effect for d in DOCUMENTS]),
+        (
+            "lazy + whos_allowed",
+            lambda: [Statement(d).whos_allowed() for d in DOCUMENTS],
+        ),
+    ]
+    for label, func in cases:
+        best = min(timeit.repeat(func, number=number, repeat=3)) / number
+        print("{:<24} {:8.3f} us/statement".format(label, best / len(DOCUMENTS) * 1e6))
+
+    print()
+    for label, cls in [("eager", EagerStatement), ("lazy", Statement)]:
+        print("{:<24} {:8.0f} bytes/statement".format(label, memory_per_statement(cls)))
+
+
+if __name__ == "__main__":
+    main()
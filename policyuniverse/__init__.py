@@ -1,29 +1,33 @@
 """
 isort:skip_file
 """
-import json
-import os
 import logging
 
-_action_categories = dict()
-all_permissions = set()
+# Logging
+logger = logging.getLogger(__name__)
+
 # autopep8: off
-from policyuniverse.action_categories import build_action_categories_from_service_data
-from policyuniverse.action import build_service_actions_from_service_data
+from policyuniverse.catalog import service_data_path
 
+# The service data and the tables derived from it are loaded on first access
+# (see policyuniverse.catalog) so that importing policyuniverse.arn or
+# policyuniverse.organization never has to parse data.json.
+_lazy_attributes = {
+    "service_data": lambda catalog: catalog.get_service_data(),
+    "_action_categories": lambda catalog: catalog.get_catalog().action_categories,
+    "all_permissions": lambda catalog: catalog.get_catalog().permissions,
+}
 
-# Logging
-logger = logging.getLogger(__name__)
 
-# Read Input Data
-service_data_path = os.path.join(
-    os.path.dirname(os.path.realpath(__file__)), "data.json"
-)
+def __getattr__(name):
+    if name in _lazy_attributes:
+        from policyuniverse import catalog
 
-service_data = json.load(open(service_data_path, "r"))
+        value = _lazy_attributes[name](catalog)
+        globals()[name] = value
+        return value
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
 
-_action_categories.update(build_action_categories_from_service_data(service_data))
-all_permissions.update(build_service_actions_from_service_data(service_data))
 
 # These have been refactored to other files, but
 # some dependencies still try to import them from here:
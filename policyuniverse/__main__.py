@@ -0,0 +1,5 @@
+import sys
+
+from policyuniverse.catalog import main
+
+sys.exit(main())
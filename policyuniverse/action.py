@@ -19,6 +19,22 @@
 .. moduleauthor::  Patrick Kelley <patrickbarrettkelley@gmail.com> @patrickbkelley
 
 """
+# Offsets of the set bits in every possible byte, for walking ActionSet bitmaps.
+_BYTE_OFFSETS = tuple(
+    tuple(offset for offset in range(8) if byte & (1 << offset)) for byte in range(256)
+)
+
+
+def iter_bits(bits):
+    """Yields the positions of the set bits in a non-negative int, ascending."""
+    if not bits:
+        return
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    for byte_index, byte in enumerate(data):
+        if byte:
+            base = byte_index * 8
+            for offset in _BYTE_OFFSETS[byte]:
+                yield base + offset
 
 
 def build_service_actions_from_service_data(service_data):
@@ -31,5 +47,114 @@ def build_service_actions_from_service_data(service_data):
     return permissions
 
 
-# TODO: Helper Action class
-# May also want to create a service.py
+class ActionSet(object):
+    """An immutable set of actions, stored as a bitmap over catalog action IDs.
+
+    Bit N is set when catalog.actions[N] is in the set, so union, intersection,
+    difference and complement are single integer operations.  Actions the
+    catalog doesn't know about (unknown services, typos, unmatched wildcards)
+    are carried alongside in `unknown` so converting back to strings loses
+    nothing.  The complement of a set never contains unknown actions.
+
+    Build them through ActionCatalog.action_set() and friends.  Instances
+    can't be modified, so they are safe to cache and share.
+    """
+
+    __slots__ = ("catalog", "bits", "unknown", "_names")
+
+    def __init__(self, catalog, bits=0, unknown=frozenset()):
+        object.__setattr__(self, "catalog", catalog)
+        object.__setattr__(self, "bits", bits)
+        object.__setattr__(self, "unknown", unknown)
+        object.__setattr__(self, "_names", None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ActionSet is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("ActionSet is immutable")
+
+    def _combine(self, other, bits, unknown):
+        if not isinstance(other, ActionSet):
+            return NotImplemented
+        if other.catalog is not self.catalog:
+            raise ValueError("Cannot combine ActionSets from different catalogs.")
+        return ActionSet(self.catalog, bits, unknown)
+
+    def union(self, other):
+        return self._combine(
+            other, self.bits | other.bits, self.unknown | other.unknown
+        )
+
+    def intersection(self, other):
+        return self._combine(
+            other, self.bits & other.bits, self.unknown & other.unknown
+        )
+
+    def difference(self, other):
+        return self._combine(
+            other, self.bits & ~other.bits, self.unknown - other.unknown
+        )
+
+    def complement(self):
+        return ActionSet(self.catalog, self.catalog.all_bits ^ self.bits)
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+    __invert__ = complement
+
+    def ids(self):
+        """Yields the catalog IDs of the known actions, in ascending order."""
+        return iter_bits(self.bits)
+
+    def names(self):
+        """Sorted tuple of the action strings, computed once per instance."""
+        if self._names is None:
+            actions = self.catalog.actions
+            names = tuple([actions[action_id] for action_id in self.ids()])
+            if self.unknown:
+                names = tuple(sorted(names + tuple(self.unknown)))
+            object.__setattr__(self, "_names", names)
+        return self._names
+
+    def to_set(self):
+        """Returns a plain set of action strings."""
+        actions = self.catalog.actions
+        result = set([actions[action_id] for action_id in self.ids()])
+        result.update(self.unknown)
+        return result
+
+    def __iter__(self):
+        actions = self.catalog.actions
+        for action_id in self.ids():
+            yield actions[action_id]
+        for action in self.unknown:
+            yield action
+
+    def __len__(self):
+        return bin(self.bits).count("1") + len(self.unknown)
+
+    def __bool__(self):
+        return bool(self.bits or self.unknown)
+
+    def __contains__(self, action):
+        action_id = self.catalog.ids.get(action)
+        if action_id is None:
+            return action in self.unknown
+        return bool(self.bits >> action_id & 1)
+
+    def __eq__(self, other):
+        if not isinstance(other, ActionSet):
+            return NotImplemented
+        return (
+            self.catalog is other.catalog
+            and self.bits == other.bits
+            and self.unknown == other.unknown
+        )
+
+    def __hash__(self):
+        return hash((self.bits, self.unknown))
+
+    def __repr__(self):
+        return "<ActionSet of {} actions>".format(len(self))
@@ -1,6 +1,7 @@
 from collections import defaultdict
 
-from policyuniverse import _action_categories
+from policyuniverse.action import ActionSet
+from policyuniverse.catalog import get_catalog
 
 
 def translate_aws_action_groups(groups):
@@ -57,9 +58,28 @@ def build_action_categories_from_service_data(service_data):
     return action_categories
 
 
+def _categories_for_action_set(action_set):
+    catalog = action_set.catalog
+    bits = action_set.bits
+
+    groups = defaultdict(set)
+    if bits == catalog.all_bits:
+        for service, histogram in catalog.category_histograms.items():
+            if histogram:
+                groups[service] = set(histogram)
+    elif bits:
+        for service in catalog.services_in(bits):
+            categories = catalog.service_categories(service, bits)
+            if categories:
+                groups[service] = categories
+    for action in action_set.unknown:
+        groups[action.split(":")[0]].add(None)
+    return groups
+
+
 def categories_for_actions(actions):
     """
-    Given an iterable of actions, return a mapping of action groups.
+    Given an iterable of actions (or an ActionSet), return a mapping of action groups.
 
     actions: {'ec2:authorizesecuritygroupingress', 'iam:putrolepolicy', 'iam:listroles'}
 
@@ -69,25 +89,40 @@ def categories_for_actions(actions):
             'iam': {'Permissions', 'List'})
         }
     """
+    if isinstance(actions, ActionSet):
+        return _categories_for_action_set(actions)
+
+    action_categories = get_catalog().action_categories
     groups = defaultdict(set)
     for action in actions:
         service = action.split(":")[0]
-        groups[service].add(_action_categories.get(action))
+        groups[service].add(action_categories.get(action))
     return groups
 
 
-def actions_for_category(category):
+def actions_for_category(category, service=None):
     """
     Returns set of actions containing each group passed in.
 
     Param:
         category must be in {'Permissions', 'List', 'Read', 'Tagging', 'Write'}
+        service optionally limits the result to one service prefix, e.g. 'kms'
 
     Returns:
         set of matching actions
     """
-    actions = set()
-    for action, action_category in _action_categories.items():
-        if action_category == category:
-            actions.add(action)
-    return actions
+    catalog = get_catalog()
+    if category not in catalog.category_names:
+        return set()
+    code = catalog.category_names.index(category)
+
+    if service is None:
+        start, end = 0, len(catalog.actions)
+    else:
+        start, end = catalog.services.get(service, (0, 0))
+
+    categories = catalog.categories
+    actions = catalog.actions
+    return set(
+        [actions[index] for index in range(start, end) if categories[index] == code]
+    )
@@ -0,0 +1,208 @@
+#     Copyright 2018 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.action_index
+    :platform: Unix
+
+.. version:: $$VERSION$$
+.. moduleauthor::  Patrick Kelley <patrickbarrettkelley@gmail.com> @patrickbkelley
+
+Reverse index from actions to the policy statements that grant (or deny) them.
+
+    index = ActionIndex()
+    for role in roles:
+        index.add(role.arn, Policy(role.document))
+
+    index.who_can("iam:PassRole")
+    index.policies("kms:*", effect="Deny")
+    index.policies_for_category("Permissions", service="kms")
+
+Only Effect, Action and NotAction are indexed; principals, resources and
+conditions are not taken into account.
+"""
+from collections import defaultdict, namedtuple
+
+from policyuniverse.action import iter_bits
+from policyuniverse.action_categories import actions_for_category
+from policyuniverse.catalog import get_catalog
+from policyuniverse.expander_minimizer import expand_action_set
+
+# statement is the statement's position in its policy.
+IndexEntry = namedtuple("IndexEntry", "key statement effect")
+
+EFFECTS = ("Allow", "Deny")
+
+
+class _EffectIndex(object):
+    """Postings for the statements with one Effect.
+
+    Most statements are posted under each action they cover.  Statements
+    covering most of the catalog ('*', NotAction) are kept in dense with
+    their bitmaps instead, and posted under the few actions they don't cover.
+    """
+
+    __slots__ = ("postings", "unknown", "dense", "excluded")
+
+    def __init__(self):
+        self.postings = defaultdict(set)
+        self.unknown = defaultdict(set)
+        self.dense = dict()
+        self.excluded = defaultdict(set)
+
+    def _is_dense(self, action_set):
+        return (
+            len(action_set) - len(action_set.unknown)
+            > len(action_set.catalog.actions) // 2
+        )
+
+    def add(self, entry_id, action_set):
+        for action in action_set.unknown:
+            self.unknown[action].add(entry_id)
+        if self._is_dense(action_set):
+            self.dense[entry_id] = action_set.bits
+            for action_id in iter_bits(action_set.catalog.all_bits ^ action_set.bits):
+                self.excluded[action_id].add(entry_id)
+        else:
+            for action_id in iter_bits(action_set.bits):
+                self.postings[action_id].add(entry_id)
+
+    def remove(self, entry_id, action_set):
+        for action in action_set.unknown:
+            _discard(self.unknown, action, entry_id)
+        if entry_id in self.dense:
+            del self.dense[entry_id]
+            for action_id in iter_bits(action_set.catalog.all_bits ^ action_set.bits):
+                _discard(self.excluded, action_id, entry_id)
+        else:
+            for action_id in iter_bits(action_set.bits):
+                _discard(self.postings, action_id, entry_id)
+
+    def lookup(self, action_id):
+        """Entries covering a single catalog action."""
+        found = set(self.postings.get(action_id, ()))
+        excluded = self.excluded.get(action_id, ())
+        found.update(entry_id for entry_id in self.dense if entry_id not in excluded)
+        return found
+
+    def match(self, action_set):
+        """Entries covering any action of an ActionSet."""
+        found = set()
+        for action_id in iter_bits(action_set.bits):
+            found.update(self.postings.get(action_id, ()))
+        for action in action_set.unknown:
+            found.update(self.unknown.get(action, ()))
+        for entry_id, bits in self.dense.items():
+            if action_set.bits & bits:
+                found.add(entry_id)
+        return found
+
+
+def _discard(postings, key, entry_id):
+    entries = postings[key]
+    entries.discard(entry_id)
+    if not entries:
+        del postings[key]
+
+
+class ActionIndex(object):
+    """Maps actions to the (policy, statement) entries that grant them.
+
+    Policies are added under a key of the caller's choosing (an ARN, a
+    name...) and can be removed or replaced at any time.  Queries take an
+    action or a wildcard pattern, expanded through the catalog.
+    """
+
+    def __init__(self, policies=None):
+        self._next_id = 0
+        self._entries = dict()
+        self._keys = dict()
+        self._effects = dict((effect, _EffectIndex()) for effect in EFFECTS)
+        if policies is not None:
+            for key, policy in dict(policies).items():
+                self.add(key, policy)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def add(self, key, policy):
+        """Indexes a Policy under key, replacing any policy already there."""
+        if key in self._keys:
+            self.remove(key)
+
+        entry_ids = []
+        for position, statement in enumerate(policy.statements):
+            effect = statement.effect
+            if effect not in self._effects:
+                continue
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (
+                IndexEntry(key, position, effect),
+                statement.action_set,
+            )
+            self._effects[effect].add(entry_id, statement.action_set)
+            entry_ids.append(entry_id)
+        self._keys[key] = entry_ids
+
+    def remove(self, key):
+        """Removes the policy indexed under key."""
+        for entry_id in self._keys.pop(key):
+            entry, action_set = self._entries.pop(entry_id)
+            self._effects[entry.effect].remove(entry_id, action_set)
+
+    def _entry_ids(self, pattern, effect):
+        index = self._effects[effect]
+        catalog = get_catalog()
+        action = pattern.lower()
+        if "*" not in action and action in catalog.ids:
+            return index.lookup(catalog.ids[action])
+        return index.match(expand_action_set([pattern]))
+
+    def entries(self, pattern, effect="Allow"):
+        """IndexEntries whose statements grant (or, for Deny, deny) any action
+        matching pattern."""
+        return frozenset(
+            self._entries[entry_id][0] for entry_id in self._entry_ids(pattern, effect)
+        )
+
+    def policies(self, pattern, effect="Allow"):
+        """Keys of the policies with a statement matching pattern."""
+        return frozenset(
+            self._entries[entry_id][0].key
+            for entry_id in self._entry_ids(pattern, effect)
+        )
+
+    def who_can(self, *actions):
+        """Keys of the policies that allow every one of the actions and don't
+        explicitly deny any of them."""
+        keys = None
+        for action in actions:
+            allowed = self.policies(action) - self.policies(action, effect="Deny")
+            keys = allowed if keys is None else keys & allowed
+            if not keys:
+                break
+        return frozenset(keys or ())
+
+    def policies_for_category(self, category, service=None, effect="Allow"):
+        """Keys of the policies with a statement matching any action in a
+        category, e.g. ('Permissions', 'kms')."""
+        catalog = get_catalog()
+        action_set = catalog.action_set(actions_for_category(category, service))
+        return frozenset(
+            self._entries[entry_id][0].key
+            for entry_id in self._effects[effect].match(action_set)
+        )
@@ -20,61 +20,143 @@
 
 """
 import re
+from collections import namedtuple
 
 from policyuniverse import logger
+from policyuniverse.common import LRUCache
+
+# ARNs, account numbers and the two forms of AWS service principal, tried in
+# that order, in one pass.
+_PATTERN = re.compile(
+    r"^(?:"
+    r"arn:([^:]*):([^:]*):([^:]*):(|\*|[\d]{12}|cloudfront|aws):(.+)"
+    r"|(?:\d{12})+"
+    r"|(([^.]+)(.[^.]+)?)\.amazon(?:aws)?\.com"
+    r"|([^.]+).aws.internal"
+    r")$"
+)
+
+ARNColumns = namedtuple(
+    "ARNColumns",
+    "arn partition tech region account_number name error root service",
+)
+
+_UNPARSEABLE = (None, None, None, None, None, True, False, False)
+
+
+def _parse(raw):
+    """Returns (partition, tech, region, account_number, name, error, root, service)."""
+    match = _PATTERN.match(raw)
+    if match is None:
+        return _UNPARSEABLE
+    (
+        partition,
+        tech,
+        region,
+        account_number,
+        name,
+        service,
+        _,
+        _,
+        internal,
+    ) = match.groups()
+    if partition is not None:
+        root = tech == "iam" and name == "root"
+        return partition, tech, region, account_number, name, False, root, False
+    if service is not None:
+        return None, service, None, None, None, False, False, True
+    if internal is not None:
+        return None, internal, None, None, None, False, False, True
+    return None, None, None, raw, None, False, False, False
+
+
+def parse_many(raws, numpy=False):
+    """Parses many ARNs into columns instead of ARN objects.
+
+    Returns ARNColumns of parallel lists, one entry per input: the raw
+    strings, then partition, tech, region, account_number and name (None
+    where they don't apply) and the error, root and service flags.  Each
+    distinct string is parsed once.
+
+    With numpy=True the columns are NumPy arrays: strings as object arrays,
+    flags as bool arrays.  NumPy is only imported in that case.
+    """
+    seen = {}
+    rows = []
+    for raw in raws:
+        row = seen.get(raw)
+        if row is None:
+            row = seen[raw] = (raw,) + _parse(raw)
+        rows.append(row)
+
+    if rows:
+        columns = [list(column) for column in zip(*rows)]
+    else:
+        columns = [[] for _ in ARNColumns._fields]
+    if numpy:
+        import numpy as np
+
+        columns = [np.array(column, dtype=object) for column in columns[:6]] + [
+            np.array(column, dtype=bool) for column in columns[6:]
+        ]
+    return ARNColumns(*columns)
 
 
 class ARN(object):
-    arn = None
-    tech = None
-    region = None
-    account_number = None
-    name = None
-    partition = None
-    error = False
-    root = False
-    service = False
+    """A parsed ARN, account number or AWS service principal.
+
+    ARNs are immutable.  ARN.parse(raw) returns a shared instance for
+    strings it has seen recently, which is much cheaper than ARN(raw) for
+    the account roots and service principals that turn up in policy after
+    policy.
+    """
+
+    __slots__ = (
+        "arn",
+        "tech",
+        "region",
+        "account_number",
+        "name",
+        "partition",
+        "error",
+        "root",
+        "service",
+    )
+
+    # Recently parsed ARNs, keyed by the raw string.
+    _interned = LRUCache(maxsize=16384)
 
     def __init__(self, raw):
-        self.arn = raw
-        arn_match = re.search(
-            r"^arn:([^:]*):([^:]*):([^:]*):(|\*|[\d]{12}|cloudfront|aws):(.+)$", raw
+        partition, tech, region, account_number, name, error, root, service = _parse(
+            raw
         )
-        if arn_match:
-            if arn_match.group(2) == "iam" and arn_match.group(5) == "root":
-                self.root = True
-
-            self._from_arn(arn_match)
-            return
-
-        acct_number_match = re.search(r"^(\d{12})+$", raw)
-        if acct_number_match:
-            self._from_account_number(raw)
-            return
-
-        aws_service_match = re.search(r"^(([^.]+)(.[^.]+)?)\.amazon(aws)?\.com$", raw)
-        if aws_service_match:
-            self._from_aws_service(aws_service_match.group(1))
-            return
-
-        aws_service_match = re.search(r"^([^.]+).aws.internal$", raw)
-        if aws_service_match:
-            self._from_aws_service(aws_service_match.group(1))
-            return
-
-        self.error = True
-        logger.debug("ARN Could not parse [{}].".format(raw))
-
-    def _from_arn(self, arn_match):
-        self.partition = arn_match.group(1)
-        self.tech = arn_match.group(2)
-        self.region = arn_match.group(3)
-        self.account_number = arn_match.group(4)
-        self.name = arn_match.group(5)
-
-    def _from_account_number(self, raw):
-        self.account_number = raw
-
-    def _from_aws_service(self, service):
-        self.tech = service
-        self.service = True
+        if error:
+            logger.debug("ARN Could not parse [{}].".format(raw))
+        _set = object.__setattr__
+        _set(self, "arn", raw)
+        _set(self, "tech", tech)
+        _set(self, "region", region)
+        _set(self, "account_number", account_number)
+        _set(self, "name", name)
+        _set(self, "partition", partition)
+        _set(self, "error", error)
+        _set(self, "root", root)
+        _set(self, "service", service)
+
+    @classmethod
+    def parse(cls, raw):
+        """Returns the ARN for raw, shared with earlier calls for the same string."""
+        arn = cls._interned.get(raw)
+        if arn is None:
+            arn = cls(raw)
+            cls._interned.put(raw, arn)
+        return arn
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ARN objects are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("ARN objects are immutable")
+
+    def __repr__(self):
+        return "<ARN {!r}>".format(self.arn)
@@ -0,0 +1,115 @@
+#     Copyright 2018 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.bulk
+    :platform: Unix
+
+.. version:: $$VERSION$$
+.. moduleauthor::  Patrick Kelley <patrickbarrettkelley@gmail.com> @patrickbkelley
+
+Analyze many policies at once across a pool of worker processes.
+
+    from policyuniverse.bulk import analyze
+
+    for result in analyze(policies, workers=8):
+        if result.internet_accessible:
+            ...
+"""
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from policyuniverse.catalog import get_catalog
+from policyuniverse.policy import Policy
+
+# whos_allowed is a sorted tuple of (category, value) pairs and action_summary
+# maps each service to a sorted tuple of categories.  error is None unless the
+# policy couldn't be analyzed, in which case the other fields are None.
+PolicyAnalysis = namedtuple(
+    "PolicyAnalysis",
+    "index internet_accessible whos_allowed action_summary error",
+)
+
+
+def _init_worker():
+    # Load the catalog before the first task instead of inside it.
+    get_catalog()
+
+
+def analysis_fields(document):
+    """(internet_accessible, whos_allowed, action_summary, error) for a document."""
+    try:
+        policy = Policy(document)
+        who = sorted((entry.category, entry.value) for entry in policy.whos_allowed())
+        return (
+            policy.is_internet_accessible(),
+            tuple(who),
+            dict(
+                (service, tuple(sorted(categories)))
+                for service, categories in policy.action_summary().items()
+            ),
+            None,
+        )
+    except Exception as e:
+        return None, None, None, "{}: {}".format(type(e).__name__, e)
+
+
+def _analyze_one(index, document, cache=None):
+    if cache is not None:
+        return cache.analyze(document, index=index)
+    return PolicyAnalysis(index, *analysis_fields(document))
+
+
+def _analyze_chunk(chunk, cache=None):
+    return [_analyze_one(index, document, cache) for index, document in chunk]
+
+
+def _chunks(documents, chunksize):
+    chunk = []
+    for item in enumerate(documents):
+        chunk.append(item)
+        if len(chunk) == chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def analyze(policies, workers=None, chunksize=64, cache=None):
+    """Yields a PolicyAnalysis for each policy, in input order.
+
+    policies is an iterable of policy documents (or Policy objects, whose
+    documents are used).  workers is the number of processes, defaulting to
+    the number of CPUs; workers=0 analyzes everything in this process, with
+    the same results, which is easier to debug.  Policies are sent to the
+    workers chunksize at a time.
+
+    cache is an optional policyuniverse.result_cache.ResultCache; each
+    worker opens its own connection to it.
+    """
+    documents = (
+        policy.policy if isinstance(policy, Policy) else policy for policy in policies
+    )
+    chunks = _chunks(documents, chunksize)
+
+    if workers == 0:
+        for chunk in chunks:
+            for result in _analyze_chunk(chunk, cache):
+                yield result
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for results in pool.map(partial(_analyze_chunk, cache=cache), chunks):
+            for result in results:
+                yield result
@@ -0,0 +1,529 @@
+#     Copyright 2018 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.catalog
+    :platform: Unix
+
+.. version:: $$VERSION$$
+.. moduleauthor::  Patrick Kelley <patrickbarrettkelley@gmail.com> @patrickbkelley
+
+"""
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import struct
+import sys
+import threading
+from collections import defaultdict
+
+from policyuniverse import logger
+from policyuniverse.action import ActionSet
+from policyuniverse.wildcard import (
+    PREFIX,
+    compile_wildcard,
+    compile_wildcards,
+    has_wildcard,
+)
+
+_package_path = os.path.dirname(os.path.realpath(__file__))
+service_data_path = os.path.join(_package_path, "data.json")
+
+# A precompiled copy of the catalog tables, generated from data.json by
+# `python -m policyuniverse`. It records the sha256 of the data.json it was
+# built from and is ignored whenever that doesn't match.  The tables are
+# stored as UTF-8 text, raw bytes and little-endian integers, so one file
+# works on every Python version.
+snapshot_path = os.path.join(_package_path, "catalog.bin")
+SNAPSHOT_FORMAT = 3
+_SNAPSHOT_MAGIC = b"PUCATALOG"
+# Format, then the sizes of the version, actions, categories, category names
+# and service prefixes sections; the service (start, end) offsets follow.
+_SNAPSHOT_HEADER = struct.Struct("<6I")
+
+_lock = threading.RLock()
+_service_data = None
+_catalog = None
+
+
+def _bitmap(indices, size):
+    """int with the given bits (all below size) set."""
+    bitmap = bytearray((size + 7) // 8)
+    for index in indices:
+        bitmap[index >> 3] |= 1 << (index & 7)
+    return int.from_bytes(bytes(bitmap), "little")
+
+
+class ActionCatalog(object):
+    """The set of known AWS actions and their categories.
+
+    actions: sorted tuple of every lowercase 'prefix:action'; an action's
+        index in it is its ID
+    categories: bytes holding one index into category_names per action
+    services: {prefix: (start, end)} slice of actions belonging to each service
+    version: sha256 of the data.json the catalog was built from
+
+    Each service's actions are also kept as a sorted tuple and, once asked
+    for, a frozenset, so per-service lookups never touch other services.
+    """
+
+    def __init__(self, actions, categories, category_names, services, version=None):
+        self.actions = actions
+        self.categories = categories
+        self.category_names = category_names
+        self.services = services
+        self.version = version
+        self.all_bits = (1 << len(actions)) - 1
+        self.service_tables = {
+            prefix: actions[start:end] for prefix, (start, end) in services.items()
+        }
+        self._service_sets = {}
+        self._service_order = sorted(services, key=lambda prefix: services[prefix])
+        self._service_starts = [services[prefix][0] for prefix in self._service_order]
+        self._ids = None
+        self._permissions = None
+        self._action_categories = None
+        self._category_histograms = None
+        self._category_masks = None
+
+    @property
+    def ids(self):
+        """{action: ID}"""
+        if self._ids is None:
+            self._ids = {action: index for index, action in enumerate(self.actions)}
+        return self._ids
+
+    @property
+    def permissions(self):
+        """Set of every action, as exposed by policyuniverse.all_permissions."""
+        if self._permissions is None:
+            self._permissions = set(self.actions)
+        return self._permissions
+
+    @property
+    def action_categories(self):
+        """{action: category}, as exposed by policyuniverse._action_categories."""
+        if self._action_categories is None:
+            category_names = self.category_names
+            self._action_categories = dict(
+                zip(self.actions, [category_names[code] for code in self.categories])
+            )
+        return self._action_categories
+
+    @property
+    def category_histograms(self):
+        """{prefix: {category: number of the service's actions in it}}"""
+        if self._category_histograms is None:
+            category_names = self.category_names
+            histograms = {}
+            for prefix, (start, end) in self.services.items():
+                codes = self.categories[start:end]
+                histograms[prefix] = dict(
+                    (category_names[code], codes.count(code)) for code in set(codes)
+                )
+            self._category_histograms = histograms
+        return self._category_histograms
+
+    @property
+    def category_masks(self):
+        """{prefix: ((category, bitmap), ...)} with one bitmap of the service's
+        actions per category, bit 0 being the service's first action."""
+        if self._category_masks is None:
+            category_names = self.category_names
+            masks = {}
+            for prefix, (start, end) in self.services.items():
+                positions = defaultdict(list)
+                for index, code in enumerate(self.categories[start:end]):
+                    positions[code].append(index)
+                masks[prefix] = tuple(
+                    (category_names[code], _bitmap(indices, end - start))
+                    for code, indices in sorted(positions.items())
+                )
+            self._category_masks = masks
+        return self._category_masks
+
+    def services_in(self, bits):
+        """Prefixes of the services with actions in a bitmap of IDs.
+
+        Only services between its lowest and highest set bit are checked.
+        """
+        if not bits:
+            return []
+        low = (bits & -bits).bit_length() - 1
+        high = bits.bit_length()
+        first = max(bisect.bisect_right(self._service_starts, low) - 1, 0)
+        last = bisect.bisect_left(self._service_starts, high)
+        return self._service_order[first:last]
+
+    def service_categories(self, prefix, bits):
+        """Set of the categories of one service's actions in a bitmap of IDs.
+
+        A whole service is answered from its histogram, anything less with
+        one AND per category.
+        """
+        start, end = self.services[prefix]
+        full = (1 << (end - start)) - 1
+        service_bits = bits >> start & full
+        if not service_bits:
+            return set()
+        if service_bits == full:
+            return set(self.category_histograms[prefix])
+        return set(
+            category
+            for category, mask in self.category_masks[prefix]
+            if service_bits & mask
+        )
+
+    def service_actions(self, prefix):
+        """frozenset of the actions of one service, e.g. 'kms'."""
+        service_set = self._service_sets.get(prefix)
+        if service_set is None:
+            service_set = frozenset(self.service_tables.get(prefix, ()))
+            self._service_sets[prefix] = service_set
+        return service_set
+
+    def sorted_service_actions(self, prefix):
+        """Sorted tuple of the actions of one service, e.g. 'kms'."""
+        return self.service_tables.get(prefix, ())
+
+    def empty(self):
+        return ActionSet(self)
+
+    def universe(self):
+        return ActionSet(self, self.all_bits)
+
+    def range_set(self, start, end):
+        """ActionSet of the actions with IDs in [start, end)."""
+        if end <= start:
+            return ActionSet(self)
+        return ActionSet(self, ((1 << (end - start)) - 1) << start)
+
+    def _bits(self, action_ids):
+        return _bitmap(action_ids, len(self.actions))
+
+    def id_set(self, action_ids):
+        """ActionSet of the given action IDs."""
+        return ActionSet(self, self._bits(action_ids))
+
+    def prefix_range(self, prefix):
+        """(start, end) IDs of the actions that begin with prefix.
+
+        When the prefix names a service only that service's slice is searched.
+        """
+        service, colon, _ = prefix.partition(":")
+        if colon:
+            start, end = self.services.get(service, (0, 0))
+            if prefix == service + colon:
+                return start, end
+        else:
+            start, end = 0, len(self.actions)
+        actions = self.actions
+        start = bisect.bisect_left(actions, prefix, start, end)
+        end = bisect.bisect_left(actions, prefix + "\U0010ffff", start, end)
+        return start, end
+
+    def expand(self, pattern):
+        """ActionSet of the known actions matching a lowercase IAM wildcard pattern.
+
+        Only the actions sharing the pattern's literal prefix are looked at, so
+        'ec2:describe*' is a range lookup and 'swf:*task*' scans just swf.
+        """
+        if not has_wildcard(pattern):
+            action_id = self.ids.get(pattern)
+            if action_id is None:
+                return ActionSet(self)
+            return ActionSet(self, 1 << action_id)
+
+        wildcard = compile_wildcard(pattern)
+        start, end = self.prefix_range(wildcard.prefix)
+        if wildcard.kind == PREFIX:
+            return self.range_set(start, end)
+
+        match = wildcard.match
+        actions = self.actions
+        return self.id_set(
+            [action_id for action_id in range(start, end) if match(actions[action_id])]
+        )
+
+    def expand_service(self, service, patterns):
+        """Expands several lowercase wildcard patterns of one service together.
+
+        Trailing-'*' patterns are range lookups.  The rest are matched in a
+        single pass over the part of the service they can match, using one
+        combined expression.
+
+        Returns (ActionSet, patterns that matched nothing).
+        """
+        start, end = self.services.get(service, (0, 0))
+        if start == end:
+            return ActionSet(self), list(patterns)
+
+        bits = 0
+        unmatched = []
+        scans = []
+        for pattern in patterns:
+            wildcard = compile_wildcard(pattern)
+            low, high = self.prefix_range(wildcard.prefix)
+            if low == high:
+                unmatched.append(pattern)
+            elif wildcard.kind == PREFIX:
+                bits |= ((1 << (high - low)) - 1) << low
+            else:
+                scans.append((wildcard, low, high))
+
+        if scans:
+            combined = compile_wildcards([wildcard.pattern for wildcard, _, _ in scans])
+            pending = [wildcard for wildcard, _, _ in scans]
+            actions = self.actions
+            matched = []
+            for action_id in range(
+                min(low for _, low, _ in scans), max(high for _, _, high in scans)
+            ):
+                action = actions[action_id]
+                if combined.match(action):
+                    matched.append(action_id)
+                    if pending:
+                        pending = [
+                            wildcard
+                            for wildcard in pending
+                            if not wildcard.match(action)
+                        ]
+            bits |= self._bits(matched)
+            unmatched.extend(wildcard.pattern for wildcard in pending)
+
+        return ActionSet(self, bits), unmatched
+
+    def action_set(self, actions):
+        """ActionSet of the given lowercase action strings.
+
+        Anything that isn't in the catalog is kept in ActionSet.unknown.
+        """
+        ids = self.ids
+        known = []
+        unknown = set()
+        for action in actions:
+            action_id = ids.get(action)
+            if action_id is None:
+                unknown.add(action)
+            else:
+                known.append(action_id)
+        return ActionSet(self, self._bits(known), frozenset(unknown))
+
+
+def _read_service_data_bytes(path=None):
+    with open(path or service_data_path, "rb") as infile:
+        return infile.read()
+
+
+def data_version(raw):
+    return hashlib.sha256(raw).hexdigest()
+
+
+def service_actions(prefix):
+    """Returns a frozenset of every action of the service with the given prefix."""
+    return get_catalog().service_actions(prefix)
+
+
+def load_service_data(path=None):
+    return json.loads(_read_service_data_bytes(path).decode("utf-8"))
+
+
+def get_service_data():
+    """Returns the parsed contents of data.json, loading it on first use."""
+    global _service_data
+    if _service_data is None:
+        with _lock:
+            if _service_data is None:
+                _service_data = load_service_data()
+    return _service_data
+
+
+def build_catalog(service_data, version=None):
+    """Builds the catalog tables with a single pass over the service data."""
+    entries = dict()
+    for service_body in service_data.values():
+        prefix = service_body["prefix"]
+        for action, action_body in service_body["actions"].items():
+            key = "{}:{}".format(prefix, action.lower())
+            entries[key] = action_body["calculated_action_group"]
+
+    actions = tuple(sorted(entries))
+    category_names = tuple(sorted(set(entries.values())))
+    codes = {name: code for code, name in enumerate(category_names)}
+    categories = bytes(bytearray(codes[entries[action]] for action in actions))
+
+    # Actions sharing a prefix are contiguous once sorted.
+    services = dict()
+    for index, action in enumerate(actions):
+        prefix = action.split(":")[0]
+        start, _ = services.get(prefix, (index, index))
+        services[prefix] = (start, index + 1)
+
+    return ActionCatalog(actions, categories, category_names, services, version=version)
+
+
+def _join(strings):
+    return "\n".join(strings).encode("utf-8")
+
+
+def _split(blob):
+    if not blob:
+        return ()
+    return tuple(blob.decode("utf-8").split("\n"))
+
+
+def write_snapshot(catalog, path=None):
+    path = path or snapshot_path
+    services = sorted(catalog.services.items(), key=lambda service: service[1])
+    blobs = (
+        catalog.version.encode("utf-8"),
+        _join(catalog.actions),
+        bytes(catalog.categories),
+        _join(catalog.category_names),
+        _join(prefix for prefix, _ in services),
+    )
+    offsets = [offset for _, span in services for offset in span]
+    temp_path = "{}.tmp".format(path)
+    with open(temp_path, "wb") as outfile:
+        outfile.write(_SNAPSHOT_MAGIC)
+        outfile.write(
+            _SNAPSHOT_HEADER.pack(SNAPSHOT_FORMAT, *[len(blob) for blob in blobs])
+        )
+        for blob in blobs:
+            outfile.write(blob)
+        outfile.write(struct.pack("<{}I".format(len(offsets)), *offsets))
+    os.replace(temp_path, path)
+
+
+def _read_snapshot(raw):
+    """Decodes and sanity-checks a snapshot; raises ValueError if it is
+    truncated or inconsistent."""
+    offset = len(_SNAPSHOT_MAGIC)
+    snapshot_format, *sizes = _SNAPSHOT_HEADER.unpack_from(raw, offset)
+    if snapshot_format != SNAPSHOT_FORMAT:
+        return snapshot_format, None, None
+    offset += _SNAPSHOT_HEADER.size
+
+    blobs = []
+    for size in sizes:
+        end = offset + size
+        blobs.append(raw[offset:end])
+        offset = end
+    version, actions, categories, category_names, prefixes = blobs
+    actions = _split(actions)
+    category_names = _split(category_names)
+    prefixes = [sys.intern(prefix) for prefix in _split(prefixes)]
+    offsets = struct.unpack_from("<{}I".format(2 * len(prefixes)), raw, offset)
+
+    if len(categories) != len(actions) or (
+        categories and max(categories) >= len(category_names)
+    ):
+        raise ValueError("Catalog snapshot categories don't match its actions.")
+    if offsets and max(offsets) > len(actions):
+        raise ValueError("Catalog snapshot services don't match its actions.")
+
+    services = dict(
+        (prefix, (offsets[2 * index], offsets[2 * index + 1]))
+        for index, prefix in enumerate(prefixes)
+    )
+    catalog = ActionCatalog(
+        actions, categories, category_names, services, version=version.decode()
+    )
+    return snapshot_format, version.decode(), catalog
+
+
+def load_snapshot(version, path=None):
+    """Returns the catalog stored in the snapshot, or None if it is missing,
+    unreadable, or was not built from the data.json with the given version."""
+    path = path or snapshot_path
+    try:
+        with open(path, "rb") as infile:
+            raw = infile.read()
+    except (IOError, OSError):
+        return None
+
+    if not raw.startswith(_SNAPSHOT_MAGIC):
+        logger.debug("Catalog snapshot {} has an unknown format.".format(path))
+        return None
+
+    try:
+        snapshot_format, snapshot_version, catalog = _read_snapshot(raw)
+    except (struct.error, UnicodeDecodeError, ValueError):
+        logger.debug("Catalog snapshot {} could not be read.".format(path))
+        return None
+
+    if snapshot_format != SNAPSHOT_FORMAT or snapshot_version != version:
+        logger.debug("Catalog snapshot {} is stale.".format(path))
+        return None
+    return catalog
+
+
+def load_catalog():
+    """Loads the catalog from the snapshot when it matches data.json,
+    otherwise parses data.json itself."""
+    global _service_data
+    raw = _read_service_data_bytes()
+    version = data_version(raw)
+
+    catalog = load_snapshot(version)
+    if catalog is None:
+        with _lock:
+            if _service_data is None:
+                _service_data = json.loads(raw.decode("utf-8"))
+        catalog = build_catalog(_service_data, version=version)
+    return catalog
+
+
+def get_catalog():
+    """Returns the action catalog, loading it on first use."""
+    global _catalog
+    if _catalog is None:
+        with _lock:
+            if _catalog is None:
+                _catalog = load_catalog()
+    return _catalog
+
+
+def is_loaded():
+    return _catalog is not None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Build the precompiled catalog snapshot from data.json."
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit non-zero if the snapshot is missing or stale instead of writing it.",
+    )
+    args = parser.parse_args(argv)
+
+    raw = _read_service_data_bytes()
+    version = data_version(raw)
+    if args.check:
+        if load_snapshot(version) is None:
+            print("{} is missing or stale.".format(snapshot_path))
+            return 1
+        return 0
+
+    catalog = build_catalog(json.loads(raw.decode("utf-8")), version=version)
+    write_snapshot(catalog)
+    print(
+        "Wrote {} actions from {} services to {}.".format(
+            len(catalog.actions), len(catalog.services), snapshot_path
+        )
+    )
+    return 0
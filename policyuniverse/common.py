@@ -19,12 +19,15 @@
 .. moduleauthor::  George Psarakis <giwrgos.psarakis@gmail.com>
 
 """
+import json
+import threading
+from collections import OrderedDict, namedtuple
 
 try:
-    from collections.abc import Sequence
+    from collections.abc import Mapping, Sequence
 except ImportError:
     # Python 2.7 compatibility
-    from collections import Sequence
+    from collections import Mapping, Sequence
 
 try:
     # Python 2.7 compatibility
@@ -54,3 +57,117 @@ def ensure_array(obj):
         return obj
     else:
         return [obj]
+
+
+def _sorted_unique(values):
+    # Condition values can mix strings, numbers and booleans, so order them
+    # by their JSON encoding.
+    unique = dict((json.dumps(value, sort_keys=True), value) for value in values)
+    return [unique[key] for key in sorted(unique)]
+
+
+def canonical_statement(statement):
+    """Returns a normalized copy of a statement, without its Sid.
+
+    Actions are lowercased; Action, Resource, principal and condition value
+    lists are deduplicated and sorted, with single values turned into
+    one-item lists, and condition keys are lowercased.
+    """
+    canonical = {}
+    for key, value in statement.items():
+        if key == "Sid":
+            continue
+        if key in ("Action", "NotAction"):
+            value = _sorted_unique(action.lower() for action in ensure_array(value))
+        elif key in ("Resource", "NotResource"):
+            value = _sorted_unique(ensure_array(value))
+        elif key in ("Principal", "NotPrincipal"):
+            if isinstance(value, Mapping):
+                value = dict(
+                    (principal_type, _sorted_unique(ensure_array(principals)))
+                    for principal_type, principals in value.items()
+                )
+            elif is_array(value):
+                value = _sorted_unique(value)
+        elif key == "Condition" and isinstance(value, Mapping):
+            value = dict(
+                (
+                    operator,
+                    dict(
+                        (condition_key.lower(), _sorted_unique(ensure_array(values)))
+                        for condition_key, values in block.items()
+                    ),
+                )
+                for operator, block in value.items()
+            )
+        canonical[key] = value
+    return canonical
+
+
+CacheInfo = namedtuple("CacheInfo", "hits misses evictions maxsize currsize")
+
+
+class LRUCache(object):
+    """A thread-safe, bounded least-recently-used cache with hit/miss/eviction counters.
+
+    A maxsize of 0 disables caching; None lets the cache grow without bound.
+    Values are shared between callers, so only store immutable ones.
+    """
+
+    _missing = object()
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, self._missing)
+            if value is self._missing:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            if self.maxsize == 0:
+                return
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._evict()
+
+    def resize(self, maxsize):
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def _evict(self):
+        if self.maxsize is None:
+            return
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Empties the cache and resets the statistics."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(
+                self.hits, self.misses, self.evictions, self.maxsize, len(self._data)
+            )
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
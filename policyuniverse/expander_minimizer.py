@@ -21,16 +21,32 @@
 """
 from __future__ import print_function
 
+import bisect
 import copy
-import fnmatch
 import json
 import sys
+from collections import defaultdict
 
-from policyuniverse import all_permissions
-from policyuniverse.common import ensure_array
+from policyuniverse.action import ActionSet
+from policyuniverse.catalog import get_catalog
+from policyuniverse.common import LRUCache, canonical_statement, ensure_array
+from policyuniverse.wildcard import literal_prefix
 
 policy_headers = ["rolepolicies", "grouppolicies", "userpolicies", "policy"]
 
+# Wildcard expansions keyed by (catalog version, lowercase pattern). The cached
+# ActionSets are immutable. Use expansion_cache.resize(n) to change the bound,
+# expansion_cache.info() for hit/miss/eviction counts and .clear() to reset.
+expansion_cache = LRUCache(maxsize=4096)
+
+
+def __getattr__(name):
+    # all_permissions used to be imported from policyuniverse at module load.
+    # Resolve it lazily so importing this module doesn't load the catalog.
+    if name == "all_permissions":
+        return get_catalog().permissions
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
 
 def expand_minimize_over_policies(policies, activity, **kwargs):
     for header in policy_headers:
@@ -60,16 +76,27 @@ def _get_prefixes_for_action(action):
     return retval
 
 
+def _expand_pattern(pattern):
+    """Cached ActionCatalog.expand() for a lowercase pattern."""
+    catalog = get_catalog()
+    key = (catalog.version, pattern)
+    expanded = expansion_cache.get(key)
+    if expanded is None:
+        expanded = catalog.expand(pattern)
+        expansion_cache.put(key, expanded)
+    return expanded
+
+
 def _expand(action):
     """
     :param action: 'autoscaling:*'
     :return: A list of all autoscaling permissions matching the wildcard
     """
-    expanded = fnmatch.filter(all_permissions, action.lower())
+    expanded = _expand_pattern(action.lower())
     # if we get a wildcard for a tech we've never heard of, just return the wildcard
     if not expanded:
         return [action]
-    return expanded
+    return list(expanded.names())
 
 
 def _expand_wildcard_action(actions):
@@ -95,6 +122,7 @@ def _expand_wildcard_action(actions):
 
 
 def _get_desired_actions_from_statement(statement):
+    all_permissions = get_catalog().permissions
     desired_actions = set()
     actions = _expand_wildcard_action(statement["Action"])
 
@@ -108,14 +136,57 @@ def _get_desired_actions_from_statement(statement):
     return desired_actions
 
 
-def _get_denied_prefixes_from_desired(desired_actions):
-    denied_actions = all_permissions.difference(desired_actions)
-    denied_prefixes = set()
-    for denied_action in denied_actions:
-        for denied_prefix in _get_prefixes_for_action(denied_action):
-            denied_prefixes.add(denied_prefix)
+class _ServicePrefixTrie(object):
+    """A character trie over one service's slice of the sorted action table.
 
-    return denied_prefixes
+    Every node stands for a prefix and holds the [low, high) range of action
+    IDs starting with it, so "is every action under this prefix desired?" is
+    a range count.  Nodes are only created along the paths that get walked.
+    """
+
+    def __init__(self, catalog, service):
+        self.actions = catalog.actions
+        self.prefix = "{}:".format(service)
+        start, end = catalog.services[service]
+        self.root = [start, end, {}]
+
+    def walk(self, action):
+        """Yields (prefix, low, high) for 'svc:', 'svc:a', ... up to the action."""
+        actions = self.actions
+        node = self.root
+        yield self.prefix, node[0], node[1]
+        for length in range(len(self.prefix) + 1, len(action) + 1):
+            character = action[length - 1]
+            child = node[2].get(character)
+            if child is None:
+                prefix = action[:length]
+                low = bisect.bisect_left(actions, prefix, node[0], node[1])
+                high = bisect.bisect_left(actions, prefix + "\U0010ffff", low, node[1])
+                child = node[2][character] = [low, high, {}]
+            node = child
+            yield action[:length], node[0], node[1]
+
+    def action_range(self, action_id):
+        """[low, high) of the action with this ID and the actions it prefixes."""
+        actions = self.actions
+        high = bisect.bisect_left(
+            actions, actions[action_id] + "\U0010ffff", action_id, self.root[1]
+        )
+        return action_id, high
+
+
+# Per-service tries, keyed by (catalog version, service prefix), shared by
+# every statement and policy minimized against that catalog.
+_prefix_tries = LRUCache(maxsize=1024)
+
+
+def _get_prefix_trie(catalog, service):
+    key = (catalog.version, service)
+    trie = _prefix_tries.get(key)
+    if trie is None or trie.actions is not catalog.actions:
+        trie = _ServicePrefixTrie(catalog, service)
+        _prefix_tries.put(key, trie)
+    return trie
 
 
 def _check_min_permission_length(permission, minchars=None):
@@ -137,23 +208,32 @@ def minimize_statement_actions(statement, minchars=None):
         raise Exception("Minification does not currently work on Deny statements.")
 
     desired_actions = _get_desired_actions_from_statement(statement)
-    denied_prefixes = _get_denied_prefixes_from_desired(desired_actions)
+
+    catalog = get_catalog()
+    ids = catalog.ids
+    desired_ids = sorted(ids[action] for action in desired_actions)
+
+    def all_desired(low, high):
+        # A prefix is safe to wildcard when every action under it is desired.
+        desired = bisect.bisect_left(desired_ids, high)
+        desired -= bisect.bisect_left(desired_ids, low)
+        return desired == high - low
 
     for action in desired_actions:
-        if action in denied_prefixes:
+        trie = _get_prefix_trie(catalog, action.split(":")[0])
+        if not all_desired(*trie.action_range(ids[action])):
             print("Action is a denied prefix. Action: {}".format(action))
             minimized_actions.add(action)
             continue
 
         found_prefix = False
-        prefixes = _get_prefixes_for_action(action)
-        for prefix in prefixes:
+        for prefix, low, high in trie.walk(action):
 
             permission = prefix.split(":")[1]
             if _check_min_permission_length(permission, minchars=minchars):
                 continue
 
-            if prefix not in denied_prefixes:
+            if all_desired(low, high):
                 if prefix not in desired_actions:
                     prefix = "{}*".format(prefix)
                 minimized_actions.add(prefix)
@@ -161,8 +241,8 @@ def minimize_statement_actions(statement, minchars=None):
                 break
 
         if not found_prefix:
-            print("Could not suitable prefix. Defaulting to {}".format(prefixes[-1]))
-            minimized_actions.add(prefixes[-1])
+            print("Could not suitable prefix. Defaulting to {}".format(action))
+            minimized_actions.add(action)
 
     # sort the actions
     minimized_actions_list = list(minimized_actions)
@@ -171,49 +251,214 @@ def minimize_statement_actions(statement, minchars=None):
     return minimized_actions_list
 
 
-def get_actions_from_statement(statement):
-    allowed_actions = set()
-    actions = ensure_array(statement.get("Action", []))
+def _expand_action_set(action):
+    """ActionSet of everything a single action or wildcard in a statement matches.
 
-    for action in actions:
-        allowed_actions = allowed_actions.union(set(_expand_wildcard_action(action)))
+    Mirrors _expand_wildcard_action(action) for a single string.
+    """
+    action = action.lower()
+    if "*" in action:
+        expanded = _expand_pattern(action)
+        if expanded:
+            return expanded
+    return get_catalog().action_set([action])
+
+
+def expand_action_set(patterns):
+    """Like expand_actions, but returns an ActionSet."""
+    catalog = get_catalog()
+    result = catalog.empty()
+    literals = set()
+    by_service = defaultdict(list)
+    for pattern in set(pattern.lower() for pattern in ensure_array(patterns)):
+        if "*" not in pattern:
+            literals.add(pattern)
+            continue
+        service, colon, _ = literal_prefix(pattern).partition(":")
+        if colon:
+            by_service[service].append(pattern)
+        else:
+            # '*', '*:list*' and friends span services.
+            result |= _expand_action_set(pattern)
+
+    for service, service_patterns in by_service.items():
+        if len(service_patterns) == 1:
+            result |= _expand_action_set(service_patterns[0])
+            continue
+        expanded, unmatched = catalog.expand_service(service, service_patterns)
+        result |= expanded
+        literals.update(unmatched)
 
-    inverted_actions = set()
-    not_actions = ensure_array(statement.get("NotAction", []))
+    if literals:
+        result |= catalog.action_set(literals)
+    return result
 
-    for action in not_actions:
-        inverted_actions = inverted_actions.union(set(_expand_wildcard_action(action)))
 
-    if inverted_actions:
-        actions = _invert_actions(inverted_actions)
-        allowed_actions = allowed_actions.union(actions)
+def expand_actions(patterns):
+    """Expands many action patterns at once, e.g. every Action of a policy or policy set.
 
-    return allowed_actions
+    Patterns are lowercased and deduplicated, then grouped by service so each
+    service's part of the catalog is searched once for all of its patterns.
+    Returns one set of actions, with the same results as unioning
+    _expand_wildcard_action(pattern) over the patterns.
+    """
+    return expand_action_set(patterns).to_set()
 
 
-def _invert_actions(actions):
-    from policyuniverse import all_permissions
+def get_action_set_from_statement(statement):
+    """Like get_actions_from_statement, but returns an ActionSet."""
+    allowed_actions = expand_action_set(ensure_array(statement.get("Action", [])))
+    inverted_actions = expand_action_set(ensure_array(statement.get("NotAction", [])))
+
+    if inverted_actions:
+        allowed_actions |= _invert_actions(inverted_actions)
+
+    return allowed_actions
 
-    return all_permissions.difference(actions)
 
+def get_actions_from_statement(statement):
+    return get_action_set_from_statement(statement).to_set()
 
-def expand_policy(policy=None, expand_deny=False):
-    # Perform a deepcopy to avoid mutating the input
-    result = copy.deepcopy(policy)
 
-    result["Statement"] = ensure_array(result["Statement"])
-    for statement in result["Statement"]:
+def _invert_actions(actions):
+    if isinstance(actions, ActionSet):
+        return actions.complement()
+    return get_catalog().permissions.difference(actions)
+
+
+# Sorted expansions of a statement's Action/NotAction patterns, keyed by
+# (catalog version, Action patterns, NotAction patterns).  The tuples are
+# shared by every statement with the same patterns.
+_expanded_statement_actions = LRUCache(maxsize=4096)
+
+
+def _expanded_actions(statement):
+    """Sorted tuple of everything a statement's Action and NotAction allow."""
+    key = (
+        get_catalog().version,
+        frozenset(
+            action.lower() for action in ensure_array(statement.get("Action", []))
+        ),
+        frozenset(
+            action.lower() for action in ensure_array(statement.get("NotAction", []))
+        ),
+    )
+    actions = _expanded_statement_actions.get(key)
+    if actions is None:
+        actions = get_action_set_from_statement(statement).names()
+        _expanded_statement_actions.put(key, actions)
+    return actions
+
+
+def expand_policy(policy=None, expand_deny=False, shallow=False, inplace=False):
+    """Replaces each statement's Action/NotAction with the sorted actions it allows.
+
+    By default the input is deep-copied and each Action becomes a new list.
+
+    shallow=True copies only the policy, its Statement list and the
+    statements that get expanded; everything else (conditions, resources,
+    principals, skipped statements) is shared with the input, and each Action
+    is a tuple shared between statements with the same patterns.  Don't
+    mutate either policy in place afterwards.
+
+    inplace=True rewrites the statements of the given policy (also with
+    shared tuples) and returns it.
+    """
+    if inplace:
+        result = policy
+    elif shallow:
+        result = dict(policy)
+    else:
+        # Perform a deepcopy to avoid mutating the input
+        result = copy.deepcopy(policy)
+
+    statements = ensure_array(result["Statement"])
+    if shallow and not inplace:
+        statements = list(statements)
+    result["Statement"] = statements
+
+    for index, statement in enumerate(statements):
         if statement["Effect"].lower() == "deny" and not expand_deny:
             continue
-        actions = get_actions_from_statement(statement)
+        actions = _expanded_actions(statement)
+        if shallow and not inplace:
+            statement = statements[index] = dict(statement)
         if "NotAction" in statement:
             del statement["NotAction"]
-        statement["Action"] = sorted(list(actions))
+        if shallow or inplace:
+            statement["Action"] = actions
+        else:
+            statement["Action"] = list(actions)
 
     return result
 
 
-def minimize_policy(policy=None, minchars=None):
+# AWS doesn't count whitespace against policy size limits; 6144 characters is
+# the limit for managed policies.
+AWS_MANAGED_POLICY_SIZE = 6144
+
+
+def policy_size(document, size_mode="aws"):
+    """Length of a policy (or statement) as counted by the given size_mode.
+
+    aws: serialized without whitespace, the way IAM counts it.
+    pretty: serialized with indent=2, the size minimize_policy prints.
+    """
+    if size_mode == "aws":
+        return len(json.dumps(document, separators=(",", ":"), ensure_ascii=False))
+    if size_mode == "pretty":
+        return len(json.dumps(document, indent=2))
+    raise ValueError("Unknown size_mode {}".format(size_mode))
+
+
+def _minimize_policy_to_size(policy, minchars, max_size, size_mode):
+    statements = ensure_array(policy["Statement"])
+    size = policy_size(policy, size_mode=size_mode)
+    if size <= max_size:
+        return policy, size
+
+    # Only the rewritten statement changes, so the compact policy size can be
+    # kept up to date from the statement sizes alone.  Indentation makes a
+    # pretty-printed statement's size depend on its nesting, so that mode
+    # re-measures the whole policy.
+    sizes = [policy_size(statement, size_mode=size_mode) for statement in statements]
+    # Only Allow statements with an Action can be minimized.
+    candidates = [
+        index
+        for index, statement in enumerate(statements)
+        if statement.get("Effect") == "Allow" and "Action" in statement
+    ]
+    for index in sorted(candidates, key=lambda i: -sizes[i]):
+        statement = statements[index]
+        original = statement["Action"]
+        statement["Action"] = minimize_statement_actions(statement, minchars=minchars)
+        new_size = policy_size(statement, size_mode=size_mode)
+        if new_size >= sizes[index]:
+            statement["Action"] = original
+            continue
+        if size_mode == "aws":
+            size -= sizes[index] - new_size
+        else:
+            size = policy_size(policy, size_mode=size_mode)
+        if size <= max_size:
+            break
+    return policy, size
+
+
+def minimize_policy(policy=None, minchars=None, max_size=None, size_mode="aws"):
+    """Rewrites the Action of each statement to the shortest equivalent wildcards.
+
+    Without max_size every statement is minimized and the start and end sizes
+    are printed to stderr; the policy is returned.
+
+    With max_size (e.g. AWS_MANAGED_POLICY_SIZE), statements are minimized
+    largest first, and only until the policy's size as counted by size_mode
+    (see policy_size) is within max_size.  Deny and NotAction statements, and
+    statements that minimization wouldn't shrink, are left alone.  Returns (policy, size); size may still
+    exceed max_size if minimizing everything wasn't enough.
+    """
+    if max_size is not None:
+        return _minimize_policy_to_size(policy, minchars, max_size, size_mode)
 
     str_pol = json.dumps(policy, indent=2)
     size = len(str_pol)
@@ -228,3 +473,102 @@ def minimize_policy(policy=None, minchars=None):
     # print str_end_pol
     print("Start size: {}. End size: {}".format(size, end_size), file=sys.stderr)
     return policy
+
+
+# Statements that differ only in these keys grant the same thing to the same
+# principals under the same conditions, so their actions can be merged.
+_MERGEABLE_KEYS = ("Action", "Sid")
+
+
+def _merge_key(statement):
+    # Normalized, so "x" and ["x"] or reordered principal and condition
+    # values still merge.
+    rest = canonical_statement(statement)
+    for key in _MERGEABLE_KEYS:
+        rest.pop(key, None)
+    return json.dumps(rest, sort_keys=True)
+
+
+def _dedupe_actions(actions):
+    """Drops repeated actions and actions already covered by another pattern.
+
+    Keeps the first spelling of each action and the original order.  Literal
+    actions are checked against the union of the wildcards' expansions; only
+    wildcards are compared with each other.
+    """
+    patterns = []
+    seen = set()
+    for action in actions:
+        if action.lower() not in seen:
+            seen.add(action.lower())
+            patterns.append(action)
+
+    wildcards = [pattern for pattern in patterns if "*" in pattern]
+    expanded = [_expand_action_set(pattern) for pattern in wildcards]
+    covered = set()
+    for index, pattern in enumerate(wildcards):
+        for other, other_expanded in enumerate(expanded):
+            if other == index or expanded[index] - other_expanded:
+                continue
+            # Identical expansions: keep whichever came first.
+            if other_expanded - expanded[index] or other < index:
+                covered.add(pattern)
+                break
+
+    union = get_catalog().empty()
+    for wildcard_expanded in expanded:
+        union |= wildcard_expanded
+    return [
+        pattern
+        for pattern in patterns
+        if pattern not in covered and ("*" in pattern or pattern.lower() not in union)
+    ]
+
+
+def compact_policy(policy=None, minimize=False, minchars=None):
+    """Merges statements that differ only in their Action (and Sid).
+
+    Merged statements keep the position and Sid of the first statement of
+    their group, and their actions are deduplicated against the catalog:
+    'S3:GetObject' is dropped next to 's3:get*'.  Statements with a NotAction
+    are never merged.  With minimize, every Allow statement of the result is
+    then passed through minimize_statement_actions.
+
+    Returns a new policy; the input is not modified.
+    """
+    result = dict(policy)
+    statements = []
+    groups = {}
+    merged = set()
+    for statement in ensure_array(policy["Statement"]):
+        if "Action" not in statement or "NotAction" in statement:
+            statements.append(statement)
+            continue
+        key = _merge_key(statement)
+        if key not in groups:
+            groups[key] = len(statements)
+            statements.append(statement)
+            continue
+        index = groups[key]
+        if index not in merged:
+            merged.add(index)
+            statements[index] = dict(statements[index])
+            statements[index]["Action"] = ensure_array(statements[index]["Action"])
+        statements[index]["Action"] = statements[index]["Action"] + ensure_array(
+            statement["Action"]
+        )
+
+    for index in merged:
+        statements[index]["Action"] = _dedupe_actions(statements[index]["Action"])
+
+    if minimize:
+        for index, statement in enumerate(statements):
+            if "Action" in statement and statement["Effect"] == "Allow":
+                statement = dict(statement)
+                statement["Action"] = minimize_statement_actions(
+                    statement, minchars=minchars
+                )
+                statements[index] = statement
+
+    result["Statement"] = statements
+    return result
@@ -20,65 +20,123 @@
 
 """
 from policyuniverse import logger
+from policyuniverse.common import LRUCache
 
 
-class Organization(object):
-    organization = None
+def _parse(raw):
+    """Returns (organization, root, ou_path, valid_for_child_ous,
+    valid_for_parent_ou, valid_for_all_ous, error) for an org ID or org path.
+
+    Parsing stops at the first error; whatever was parsed up to then is kept.
+    """
+    components = raw.split("/")
     root = None
+
+    orgid = components[0]
+    if not (orgid.startswith("o-") or orgid == "*"):
+        logger.debug("Organization Org ID parse error [{}].".format(raw))
+        return None, None, (), False, False, True, True
+    organization = orgid
+
+    if len(components) > 1:
+        root = components[1]
+        if not (root.startswith("r-") or root == "*"):
+            logger.debug("Organization root parse error [{}].".format(raw))
+            return organization, None, (), False, False, True, True
+
+    return (organization, root) + _parse_ou_path(components[2:], raw)
+
+
+def _parse_ou_path(components, raw):
     ou_path = []
     valid_for_child_ous = False
     valid_for_parent_ou = False
     valid_for_all_ous = True
     error = False
 
-    def __init__(self, input):
-        components_list = input.split("/")
-
-        for component_index in range(0, len(components_list)):
-            component = components_list[component_index]
+    for ou in components:
+        if valid_for_parent_ou or valid_for_child_ous:
+            error = True
+            logger.debug("Organization OU validity error [{}].".format(raw))
+        elif not ou:
+            valid_for_parent_ou = True
+        elif ou == "*":
+            valid_for_child_ous = True
+            valid_for_parent_ou = True
+        elif ou == "ou-*":
+            valid_for_child_ous = True
+        else:
+            valid_for_all_ous = False
 
-            if component_index == 0:
-                self._parse_organization(component)
-            elif component_index == 1:
-                self._parse_root(component)
+            if ou.startswith("ou-"):
+                ou_path.append(ou)
             else:
-                self._parse_ou_path(component)
+                error = True
+                logger.debug("Organization OU parse error [{}].".format(raw))
 
-            if self.error:
-                return
+        if error:
+            break
 
-    def _parse_organization(self, orgid):
-        if orgid.startswith("o-") or orgid == "*":
-            self.organization = orgid
-        else:
-            self.error = True
-            logger.debug("Organization Org ID parse error [{}].".format(input))
+    return (
+        tuple(ou_path),
+        valid_for_child_ous,
+        valid_for_parent_ou,
+        valid_for_all_ous,
+        error,
+    )
 
-    def _parse_root(self, root):
-        if root.startswith("r-") or root == "*":
-            self.root = root
-        else:
-            self.error = True
-            logger.debug("Organization root parse error [{}].".format(input))
 
-    def _parse_ou_path(self, ou):
-        if self.valid_for_parent_ou or self.valid_for_child_ous:
-            self.error = True
-            logger.debug("Organization OU validity error [{}].".format(input))
-            return
+class Organization(object):
+    """A parsed AWS Organizations org ID or org path (o-xxx/r-xxx/ou-xxx/...).
 
-        if not ou:
-            self.valid_for_parent_ou = True
-        elif ou == "*":
-            self.valid_for_child_ous = True
-            self.valid_for_parent_ou = True
-        elif ou == "ou-*":
-            self.valid_for_child_ous = True
-        else:
-            self.valid_for_all_ous = False
+    Organizations are immutable and ou_path is a tuple.
+    Organization.parse(raw) returns a shared instance for strings it has seen
+    recently.
+    """
 
-            if ou.startswith("ou-"):
-                self.ou_path.append(ou)
-            else:
-                self.error = True
-                logger.debug("Organization OU parse error [{}].".format(input))
+    __slots__ = (
+        "organization",
+        "root",
+        "ou_path",
+        "valid_for_child_ous",
+        "valid_for_parent_ou",
+        "valid_for_all_ous",
+        "error",
+    )
+
+    # Recently parsed organizations, keyed by the raw string.
+    _interned = LRUCache(maxsize=4096)
+
+    def __init__(self, input):
+        (
+            organization,
+            root,
+            ou_path,
+            valid_for_child_ous,
+            valid_for_parent_ou,
+            valid_for_all_ous,
+            error,
+        ) = _parse(input)
+        _set = object.__setattr__
+        _set(self, "organization", organization)
+        _set(self, "root", root)
+        _set(self, "ou_path", ou_path)
+        _set(self, "valid_for_child_ous", valid_for_child_ous)
+        _set(self, "valid_for_parent_ou", valid_for_parent_ou)
+        _set(self, "valid_for_all_ous", valid_for_all_ous)
+        _set(self, "error", error)
+
+    @classmethod
+    def parse(cls, raw):
+        """Returns the Organization for raw, shared with earlier calls for the same string."""
+        organization = cls._interned.get(raw)
+        if organization is None:
+            organization = cls(raw)
+            cls._interned.put(raw, organization)
+        return organization
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Organization objects are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Organization objects are immutable")
@@ -19,13 +19,101 @@
 .. moduleauthor::  Patrick Kelley <patrickbarrettkelley@gmail.com> @patrickbkelley
 
 """
-from collections import defaultdict
+import hashlib
+import json
 
-from policyuniverse.common import ensure_array
+from policyuniverse.action_categories import categories_for_actions
+from policyuniverse.catalog import get_catalog
+from policyuniverse.common import canonical_statement, ensure_array
 from policyuniverse.statement import Statement
 
+try:
+    from collections.abc import Mapping
+except ImportError:
+    # Python 2.7 compatibility
+    from collections import Mapping
+
+
+def canonical_policy(document):
+    """Returns a normalized copy of a policy document for comparison.
+
+    Statements are put in a stable order and lose their Sid.  Actions are
+    lowercased; Action, Resource, principal and condition value lists are
+    deduplicated and sorted, with single values turned into one-item lists.
+    Condition keys, which IAM matches case-insensitively, are lowercased.
+    Documents that differ only in these ways have the same canonical form.
+    """
+    canonical = dict(document)
+    statements = [
+        canonical_statement(statement)
+        for statement in ensure_array(document.get("Statement", []))
+    ]
+    canonical["Statement"] = sorted(
+        statements, key=lambda statement: json.dumps(statement, sort_keys=True)
+    )
+    return canonical
+
+
+def policy_digest(document):
+    """Returns a stable SHA-256 hex digest of the document's canonical form."""
+    encoded = json.dumps(
+        canonical_policy(document), sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class _ActionSummary(Mapping):
+    """Read-only {service: frozenset of categories}.
+
+    Like the defaultdict(set) returned by Statement.action_summary, a service
+    the policy doesn't touch maps to an empty frozenset.
+    """
+
+    __slots__ = ("_summary",)
+
+    def __init__(self, summary):
+        self._summary = summary
+
+    def __getitem__(self, service):
+        return self._summary.get(service, frozenset())
+
+    def get(self, service, default=None):
+        return self._summary.get(service, default)
+
+    def __contains__(self, service):
+        return service in self._summary
+
+    def __iter__(self):
+        return iter(self._summary)
+
+    def __len__(self):
+        return len(self._summary)
+
+    def __repr__(self):
+        return "{}({!r})".format(type(self).__name__, self._summary)
+
 
 class Policy(object):
+    """An IAM policy document.
+
+    Aggregate results are computed once, on first use, and returned as
+    immutable values (frozensets, and a read-only mapping for
+    action_summary that gives an empty frozenset for untouched services), so
+    the document shouldn't be modified once wrapped.
+    """
+
+    __slots__ = (
+        "policy",
+        "statements",
+        "_cached_principals",
+        "_cached_condition_entries",
+        "_cached_action_summary",
+        "_cached_internet_accessible",
+        "_cached_internet_accessible_actions",
+        "_cached_whos_allowed",
+        "_cached_digest",
+    )
+
     def __init__(self, policy):
         self.policy = policy
         self.statements = []
@@ -35,43 +123,77 @@ class Policy(object):
         for statement in statement_structure:
             self.statements.append(Statement(statement))
 
+    def _cached(self, slot, compute):
+        try:
+            return getattr(self, slot)
+        except AttributeError:
+            value = compute()
+            setattr(self, slot, value)
+            return value
+
+    def _union(self, values_for_statement, statements=None):
+        union = set()
+        for statement in self.statements if statements is None else statements:
+            union.update(values_for_statement(statement))
+        return frozenset(union)
+
+    @property
+    def digest(self):
+        """policy_digest() of the document: equal for documents that only
+        differ in ordering, duplication, Sids or action case."""
+        return self._cached("_cached_digest", lambda: policy_digest(self.policy))
+
     @property
     def principals(self):
-        principals = set()
-        for statement in self.statements:
-            principals = principals.union(statement.principals)
-        return principals
+        return self._cached(
+            "_cached_principals",
+            lambda: self._union(lambda statement: statement.principals),
+        )
 
     @property
     def condition_entries(self):
-        condition_entries = set()
-        for statement in self.statements:
-            condition_entries = condition_entries.union(statement.condition_entries)
-        return condition_entries
+        return self._cached(
+            "_cached_condition_entries",
+            lambda: self._union(lambda statement: statement.condition_entries),
+        )
 
     def action_summary(self):
-        action_categories = defaultdict(set)
+        return self._cached("_cached_action_summary", self._action_summary)
+
+    def _action_summary(self):
+        actions = get_catalog().empty()
         for statement in self.statements:
-            for service, groups in statement.action_summary().items():
-                action_categories[service] = action_categories[service].union(groups)
-        return action_categories
+            actions |= statement.action_set
+        summary = categories_for_actions(actions)
+        return _ActionSummary(
+            dict(
+                (service, frozenset(categories))
+                for service, categories in summary.items()
+            )
+        )
 
     def is_internet_accessible(self):
-        for statement in self.statements:
-            if statement.is_internet_accessible():
-                return True
-        return False
+        return self._cached(
+            "_cached_internet_accessible",
+            lambda: any(
+                statement.is_internet_accessible() for statement in self.statements
+            ),
+        )
 
     def internet_accessible_actions(self):
-        actions = set()
-        for statement in self.statements:
-            if statement.is_internet_accessible():
-                actions = actions.union(statement.actions)
-        return actions
+        return self._cached(
+            "_cached_internet_accessible_actions",
+            lambda: self._union(
+                lambda statement: statement.actions,
+                [s for s in self.statements if s.is_internet_accessible()],
+            ),
+        )
 
     def whos_allowed(self):
-        allowed = set()
-        for statement in self.statements:
-            if statement.effect == "Allow":
-                allowed = allowed.union(statement.whos_allowed())
-        return allowed
+        return self._cached(
+            "_cached_whos_allowed",
+            lambda: self._union(
+                lambda statement: statement.whos_allowed(),
+                [s for s in self.statements if s.effect == "Allow"],
+            ),
+        )
@@ -0,0 +1,210 @@
+#     Copyright 2018 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.result_cache
+    :platform: Unix
+
+.. version:: $$VERSION$$
+.. moduleauthor::  Patrick Kelley <patrickbarrettkelley@gmail.com> @patrickbkelley
+
+Persistent SQLite cache of policy analysis results.
+
+    cache = ResultCache("/var/cache/policyuniverse.db", max_age=7 * 86400)
+    result = cache.analyze(document)
+    expanded = cache.expand_policy(document)
+
+Results are keyed by the policy digest, the catalog version and the
+policyuniverse version, so a data or library update never serves stale
+results.  Any number of processes can share one cache file.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from policyuniverse.bulk import PolicyAnalysis, analysis_fields
+from policyuniverse.catalog import get_catalog
+from policyuniverse.expander_minimizer import expand_policy
+from policyuniverse.policy import policy_digest
+
+try:
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        LIBRARY_VERSION = version("policyuniverse")
+    except PackageNotFoundError:
+        LIBRARY_VERSION = "unknown"
+except ImportError:
+    # Python 3.7
+    LIBRARY_VERSION = "unknown"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    kind TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    catalog_version TEXT NOT NULL,
+    library_version TEXT NOT NULL,
+    created REAL NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (kind, digest, catalog_version, library_version)
+)
+"""
+
+
+def _document_digest(document):
+    """Digest of the exact document, for results that depend on its layout."""
+    encoded = json.dumps(document, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ResultCache(object):
+    """Analysis results stored in a SQLite database at path.
+
+    max_entries bounds the number of stored results (oldest go first) and
+    max_age, in seconds, expires them.  Eviction runs every evict_every
+    writes and on evict(); results for other catalog or library versions are
+    dropped at the same time.
+
+    Connections are opened per process, so a ResultCache can be handed to
+    worker processes (see policyuniverse.bulk.analyze).
+    """
+
+    def __init__(self, path, max_entries=None, max_age=None, evict_every=1000):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.evict_every = evict_every
+        self._connection = None
+        self._pid = None
+        self._writes = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_connection"] = None
+        state["_pid"] = None
+        return state
+
+    @property
+    def connection(self):
+        if self._connection is None or self._pid != os.getpid():
+            # Autocommit; WAL lets readers carry on while another process
+            # writes, and the timeout waits out competing writers.
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(_SCHEMA)
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def _key(self, kind, digest):
+        return kind, digest, get_catalog().version, LIBRARY_VERSION
+
+    def get(self, kind, digest):
+        """Returns the stored value, or None if missing or expired."""
+        row = self.connection.execute(
+            "SELECT created, value FROM results WHERE kind = ? AND digest = ?"
+            " AND catalog_version = ? AND library_version = ?",
+            self._key(kind, digest),
+        ).fetchone()
+        if row is None:
+            return None
+        created, value = row
+        if self.max_age is not None and created < time.time() - self.max_age:
+            return None
+        return json.loads(value)
+
+    def put(self, kind, digest, value):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+            self._key(kind, digest)
+            + (time.time(), json.dumps(value, separators=(",", ":"))),
+        )
+        self._writes += 1
+        if self.evict_every and self._writes % self.evict_every == 0:
+            self.evict()
+
+    def evict(self):
+        """Drops expired results, results for other versions and the oldest
+        results beyond max_entries."""
+        _, _, catalog_version, library_version = self._key(None, None)
+        connection = self.connection
+        connection.execute(
+            "DELETE FROM results WHERE catalog_version != ? OR library_version != ?",
+            (catalog_version, library_version),
+        )
+        if self.max_age is not None:
+            connection.execute(
+                "DELETE FROM results WHERE created < ?", (time.time() - self.max_age,)
+            )
+        if self.max_entries is not None:
+            connection.execute(
+                "DELETE FROM results WHERE rowid IN (SELECT rowid FROM results"
+                " ORDER BY created DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def clear(self):
+        self.connection.execute("DELETE FROM results")
+
+    def close(self):
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def analyze(self, document, index=None):
+        """Cached policyuniverse.bulk analysis of one document.
+
+        Documents with the same policy_digest share a result.
+        """
+        try:
+            digest = policy_digest(document)
+        except Exception:
+            # Not a well-formed policy; let the analysis report the error.
+            return PolicyAnalysis(index, *analysis_fields(document))
+
+        cached = self.get("analysis", digest)
+        if cached is not None:
+            internet_accessible, who, summary, error = cached
+            if who is not None:
+                who = tuple(tuple(entry) for entry in who)
+                summary = dict(
+                    (service, tuple(categories))
+                    for service, categories in summary.items()
+                )
+            return PolicyAnalysis(index, internet_accessible, who, summary, error)
+
+        fields = analysis_fields(document)
+        self.put("analysis", digest, fields)
+        return PolicyAnalysis(index, *fields)
+
+    def expand_policy(self, document, expand_deny=False):
+        """Cached expand_policy(document, expand_deny).
+
+        The result keeps the document's own layout, so this is keyed by the
+        exact document rather than its policy_digest.
+        """
+        kind = "expand_deny" if expand_deny else "expand"
+        digest = _document_digest(document)
+        expanded = self.get(kind, digest)
+        if expanded is None:
+            expanded = expand_policy(document, expand_deny=expand_deny, shallow=True)
+            self.put(kind, digest, expanded)
+            # Match what a cache hit returns.
+            expanded = json.loads(json.dumps(expanded))
+        return expanded
@@ -20,13 +20,13 @@
 
 """
 import re
-from collections import namedtuple
+from collections import defaultdict, namedtuple
 
 from policyuniverse import logger
 from policyuniverse.action_categories import categories_for_actions
 from policyuniverse.arn import ARN
 from policyuniverse.common import ensure_array, is_array
-from policyuniverse.expander_minimizer import get_actions_from_statement
+from policyuniverse.expander_minimizer import get_action_set_from_statement
 from policyuniverse.organization import Organization
 
 try:
@@ -38,42 +38,189 @@ except ImportError:
 PrincipalTuple = namedtuple("Principal", "category value")
 ConditionTuple = namedtuple("Condition", "category value")
 
+# Lowercased condition keys that limit who a statement applies to, and the
+# category each one's values are reported under.
+CONDITION_KEY_CATEGORIES = {
+    "aws:sourcearn": "arn",
+    "aws:principalarn": "arn",
+    "aws:sourceowner": "account",
+    "aws:sourceaccount": "account",
+    "aws:principalaccount": "account",
+    "aws:principalorgid": "organization",
+    "aws:principalorgpaths": "organization",
+    "kms:calleraccount": "account",
+    "aws:userid": "userid",
+    "aws:sourceip": "cidr",
+    "aws:sourcevpc": "vpc",
+    "aws:sourcevpce": "vpce",
+    # a key for SAML Federation trust policy.
+    # https://docs.aws.amazon.com/IAM/latest/UserGuide/id_roles_create_for-idp_saml.html
+    # https://docs.aws.amazon.com/IAM/latest/UserGuide/id_roles_providers_create_saml_assertions.html
+    "saml:aud": "saml-endpoint",
+}
+
+# Condition operators whose keys are worth extracting.  Negated operators are
+# weak limits and are ignored, as is anything that isn't an ARN, string or IP
+# comparison.
+_RELEVANT_CONDITION_OPERATORS = [
+    re.compile(
+        "((ForAllValues|ForAnyValue):)?ARN(Equals|Like)(IfExists)?",
+        re.IGNORECASE,
+    ),
+    re.compile(
+        "((ForAllValues|ForAnyValue):)?String(Equals|Like)(IgnoreCase)?(IfExists)?",
+        re.IGNORECASE,
+    ),
+    re.compile("((ForAllValues|ForAnyValue):)?IpAddress(IfExists)?", re.IGNORECASE),
+]
+
+
+def _operator_table():
+    """Relevance of every documented condition operator, by lowercased name."""
+    relevant = [
+        "arnequals",
+        "arnlike",
+        "stringequals",
+        "stringlike",
+        "stringequalsignorecase",
+        "stringlikeignorecase",
+        "ipaddress",
+    ]
+    irrelevant = [
+        "arnnotequals",
+        "arnnotlike",
+        "stringnotequals",
+        "stringnotlike",
+        "stringnotequalsignorecase",
+        "numericequals",
+        "numericnotequals",
+        "numericlessthan",
+        "numericlessthanequals",
+        "numericgreaterthan",
+        "numericgreaterthanequals",
+        "dateequals",
+        "datenotequals",
+        "datelessthan",
+        "datelessthanequals",
+        "dategreaterthan",
+        "dategreaterthanequals",
+        "bool",
+        "binaryequals",
+        "notipaddress",
+        "null",
+    ]
+    table = {}
+    for prefix in ["", "forallvalues:", "foranyvalue:"]:
+        for suffix in ["", "ifexists"]:
+            for operator in relevant:
+                table[prefix + operator + suffix] = True
+            for operator in irrelevant:
+                table[prefix + operator + suffix] = False
+    return table
+
+
+_CONDITION_OPERATORS = _operator_table()
+
+
+def _is_relevant_condition_operator(operator):
+    relevant = _CONDITION_OPERATORS.get(operator.lower())
+    if relevant is None:
+        # Not a documented operator; fall back to the (prefix) patterns.
+        relevant = any(regex.match(operator) for regex in _RELEVANT_CONDITION_OPERATORS)
+    return relevant
+
 
 class Statement(object):
+    """An IAM policy statement.
+
+    Everything derived from the statement document is computed on first use
+    and cached, so the document shouldn't be modified once wrapped.  Derived
+    sets are frozensets and condition_entries is a tuple, so the cached
+    values can't be changed through them either.
+    """
+
+    __slots__ = (
+        "statement",
+        "_cached_condition_entries",
+        "_cached_principals",
+        "_cached_actions",
+        "_cached_action_set",
+        "_cached_actions_expanded",
+        "_cached_action_summary",
+        "_cached_resources",
+        "_cached_condition_fields",
+        "_cached_condition_orgids",
+    )
+
     def __init__(self, statement):
         self.statement = statement
-        self.condition_entries = self._condition_entries()
-        self.principals = self._principals()
-        self.actions = self._actions()
+
+    def _cached(self, slot, compute):
+        try:
+            return getattr(self, slot)
+        except AttributeError:
+            value = compute()
+            setattr(self, slot, value)
+            return value
+
+    @property
+    def condition_entries(self):
+        return self._cached("_cached_condition_entries", self._condition_entries)
+
+    @property
+    def principals(self):
+        return self._cached("_cached_principals", self._principals)
+
+    @property
+    def actions(self):
+        return self._cached("_cached_actions", self._actions)
 
     @property
     def effect(self):
         return self.statement.get("Effect")
 
+    @property
+    def action_set(self):
+        return self._cached(
+            "_cached_action_set",
+            lambda: get_action_set_from_statement(self.statement),
+        )
+
     @property
     def actions_expanded(self):
-        return set(get_actions_from_statement(self.statement))
+        return self._cached(
+            "_cached_actions_expanded", lambda: frozenset(self.action_set.names())
+        )
 
     def _actions(self):
         actions = self.statement.get("Action")
         if not actions:
-            return set()
-        actions = ensure_array(actions)
-        return set(actions)
+            return frozenset()
+        return frozenset(ensure_array(actions))
 
     def action_summary(self):
-        return categories_for_actions(self.actions_expanded)
+        summary = self._cached(
+            "_cached_action_summary",
+            lambda: categories_for_actions(self.action_set),
+        )
+        # Callers are free to modify the result.
+        return defaultdict(
+            set, ((service, set(categories)) for service, categories in summary.items())
+        )
 
     def uses_not_principal(self):
         return "NotPrincipal" in self.statement
 
     @property
     def resources(self):
+        return self._cached("_cached_resources", self._resources)
+
+    def _resources(self):
         if "NotResource" in self.statement:
-            return set(["*"])
+            return frozenset(["*"])
 
         resources = ensure_array(self.statement.get("Resource"))
-        return set(resources)
+        return frozenset(resources)
 
     def whos_allowed(self):
         """Returns set containing any entries from principal and condition section.
@@ -113,13 +260,13 @@ class Statement(object):
         "Principal": { "Service": "value" }
         "Principal": { "Service": ["value", "value"] }
 
-        Return: Set of principals
+        Return: frozenset of principals
         """
         principals = set()
         principal = self.statement.get("Principal", None)
         if not principal:
             # It is possible not to define a principal, AWS ignores these statements.
-            return principals
+            return frozenset()
 
         if isinstance(principal, Mapping):
 
@@ -135,7 +282,7 @@ class Statement(object):
         else:
             self._add_or_extend(principal, principals)
 
-        return principals
+        return frozenset(principals)
 
     def _add_or_extend(self, value, structure):
         if is_array(value):
@@ -169,64 +316,22 @@ class Statement(object):
         conditions = list()
         condition = self.statement.get("Condition")
         if not condition:
-            return conditions
-
-        key_mapping = {
-            "aws:sourcearn": "arn",
-            "aws:principalarn": "arn",
-            "aws:sourceowner": "account",
-            "aws:sourceaccount": "account",
-            "aws:principalaccount": "account",
-            "aws:principalorgid": "organization",
-            "aws:principalorgpaths": "organization",
-            "kms:calleraccount": "account",
-            "aws:userid": "userid",
-            "aws:sourceip": "cidr",
-            "aws:sourcevpc": "vpc",
-            "aws:sourcevpce": "vpce",
-            # a key for SAML Federation trust policy.
-            # https://docs.aws.amazon.com/IAM/latest/UserGuide/id_roles_create_for-idp_saml.html
-            # https://docs.aws.amazon.com/IAM/latest/UserGuide/id_roles_providers_create_saml_assertions.html
-            "saml:aud": "saml-endpoint",
-        }
-
-        relevant_condition_operators = [
-            re.compile(
-                "((ForAllValues|ForAnyValue):)?ARN(Equals|Like)(IfExists)?",
-                re.IGNORECASE,
-            ),
-            re.compile(
-                "((ForAllValues|ForAnyValue):)?String(Equals|Like)(IgnoreCase)?(IfExists)?",
-                re.IGNORECASE,
-            ),
-            re.compile(
-                "((ForAllValues|ForAnyValue):)?IpAddress(IfExists)?", re.IGNORECASE
-            ),
-        ]
-
-        for condition_operator in condition.keys():
-            if any(
-                regex.match(condition_operator)
-                for regex in relevant_condition_operators
-            ):
-                for key, value in condition[condition_operator].items():
-
-                    if key.lower() in key_mapping:
-                        if is_array(value):
-                            for v in value:
-                                conditions.append(
-                                    ConditionTuple(
-                                        value=v, category=key_mapping[key.lower()]
-                                    )
-                                )
-                        else:
-                            conditions.append(
-                                ConditionTuple(
-                                    value=value, category=key_mapping[key.lower()]
-                                )
-                            )
-
-        return conditions
+            return ()
+
+        for condition_operator, block in condition.items():
+            if not _is_relevant_condition_operator(condition_operator):
+                continue
+            for key, value in block.items():
+                category = CONDITION_KEY_CATEGORIES.get(key.lower())
+                if category is None:
+                    continue
+                if is_array(value):
+                    for v in value:
+                        conditions.append(ConditionTuple(value=v, category=category))
+                else:
+                    conditions.append(ConditionTuple(value=value, category=category))
+
+        return tuple(conditions)
 
     @property
     def condition_arns(self):
@@ -238,12 +343,12 @@ class Statement(object):
 
     @property
     def condition_orgids(self):
-        return set(
-            [
-                Organization(entry.value).organization
-                for entry in self.condition_entries
-                if entry.category == "organization"
-            ]
+        return self._cached(
+            "_cached_condition_orgids",
+            lambda: frozenset(
+                Organization.parse(value).organization
+                for value in self._condition_field("organization")
+            ),
         )
 
     @property
@@ -266,10 +371,19 @@ class Statement(object):
     def condition_vpces(self):
         return self._condition_field("vpce")
 
+    @property
+    def _condition_fields(self):
+        return self._cached("_cached_condition_fields", self._group_condition_fields)
+
+    def _group_condition_fields(self):
+        """Groups the condition entry values by category, in one pass."""
+        fields = dict()
+        for entry in self.condition_entries:
+            fields.setdefault(entry.category, set()).add(entry.value)
+        return dict((field, frozenset(values)) for field, values in fields.items())
+
     def _condition_field(self, field):
-        return set(
-            [entry.value for entry in self.condition_entries if entry.category == field]
-        )
+        return self._condition_fields.get(field, frozenset())
 
     def is_internet_accessible(self):
         if self.effect != "Allow":
@@ -331,7 +445,7 @@ class Statement(object):
         if "*" == arn_input:
             return True
 
-        arn = ARN(arn_input)
+        arn = ARN.parse(arn_input)
         if arn.error:
             logger.debug("Auditor could not parse ARN {arn}.".format(arn=arn_input))
             return "*" in arn_input
@@ -354,7 +468,7 @@ class Statement(object):
         return False
 
     def _organization_internet_accessible(self, org_input):
-        organization = Organization(org_input)
+        organization = Organization.parse(org_input)
         if organization.error:
             logger.debug("Auditor could not parse Org {org}.".format(org=org_input))
             return "o-*" in org_input
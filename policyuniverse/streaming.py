@@ -0,0 +1,184 @@
+#     Copyright 2018 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.streaming
+    :platform: Unix
+
+.. version:: $$VERSION$$
+.. moduleauthor::  Patrick Kelley <patrickbarrettkelley@gmail.com> @patrickbkelley
+
+Streaming counterpart of expand_minimize_over_policies for dumps too large to
+load at once.
+
+Documents of the form {"rolepolicies": {name: policy, ...}, ...} are parsed one
+policy at a time, so memory is bounded by the largest single policy rather
+than by the dump.  NDJSON input has one record per line, either a policy
+document or a {"header": ..., "name": ..., "policy": ...} record as written by
+write_ndjson.
+"""
+import json
+
+from policyuniverse.expander_minimizer import policy_headers
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+class _Reader(object):
+    """Incremental JSON tokenizer over a text file object."""
+
+    def __init__(self, fp, chunk_size):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+
+    def _fill(self, size):
+        # Drop what has been consumed so the buffer only ever holds the
+        # value being decoded.
+        consumed = self.position
+        data = self.fp.read(size)
+        self.buffer = self.buffer[consumed:] + data
+        self.position = 0
+        if not data:
+            self.eof = True
+
+    def _skip_whitespace(self):
+        while True:
+            while (
+                self.position < len(self.buffer)
+                and self.buffer[self.position] in _WHITESPACE
+            ):
+                self.position += 1
+            if self.position < len(self.buffer) or self.eof:
+                return
+            self._fill(self.chunk_size)
+
+    def peek(self):
+        self._skip_whitespace()
+        if self.position >= len(self.buffer):
+            raise ValueError("Unexpected end of JSON input")
+        return self.buffer[self.position]
+
+    def expect(self, character):
+        if self.peek() != character:
+            raise ValueError(
+                "Expected {!r} but found {!r}".format(character, self.peek())
+            )
+        self.position += 1
+
+    def value(self):
+        self._skip_whitespace()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.position)
+            except ValueError:
+                if self.eof:
+                    raise
+            else:
+                # A number running into the end of the buffer may continue in
+                # the next chunk.
+                if end < len(self.buffer) or self.eof:
+                    self.position = end
+                    return value
+            self._fill(size)
+            size *= 2
+
+    def members(self):
+        """Yields the keys of the object at the current position.
+
+        The caller consumes each value before asking for the next key.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.position += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self.position += 1
+                continue
+            self.expect("}")
+            return
+
+
+def iter_authorization_details(fp, chunk_size=1 << 16):
+    """Yields (header, name, policy) from a {"rolepolicies": {...}, ...} document.
+
+    Every header in policy_headers is streamed, in file order.  If the
+    document has none of them it is treated as a single policy and yielded as
+    (None, None, policy).
+    """
+    reader = _Reader(fp, chunk_size)
+    rest = {}
+    found = False
+    for key in reader.members():
+        if key in policy_headers:
+            found = True
+            for name in reader.members():
+                yield key, name, reader.value()
+        elif found:
+            reader.value()
+        else:
+            rest[key] = reader.value()
+
+    if not found:
+        yield None, None, rest
+
+
+def iter_ndjson_policies(fp):
+    """Yields (header, name, policy) for each non-blank line of an NDJSON file.
+
+    Bare policy documents are yielded as (None, line number, policy).
+    """
+    for number, line in enumerate(fp, 1):
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if "policy" in record and "Statement" not in record:
+            yield record.get("header"), record.get("name"), record["policy"]
+        else:
+            yield None, number, record
+
+
+def stream_over_policies(path, activity, ndjson=None, **kwargs):
+    """Streaming expand_minimize_over_policies over a local file.
+
+    Yields (header, name, activity(policy=policy, **kwargs)) one policy at a
+    time.  ndjson defaults to True for .ndjson and .jsonl files.
+    """
+    if ndjson is None:
+        ndjson = path.endswith((".ndjson", ".jsonl"))
+
+    with open(path, encoding="utf-8") as fp:
+        if ndjson:
+            policies = iter_ndjson_policies(fp)
+        else:
+            policies = iter_authorization_details(fp)
+        for header, name, policy in policies:
+            yield header, name, activity(policy=policy, **kwargs)
+
+
+def write_ndjson(results, fp):
+    """Writes (header, name, policy) results as NDJSON and returns the count."""
+    count = 0
+    for header, name, policy in results:
+        fp.write(json.dumps({"header": header, "name": name, "policy": policy}))
+        fp.write("\n")
+        count += 1
+    return count
@@ -0,0 +1,87 @@
+#     Copyright 2018 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.tests.test_action
+    :platform: Unix
+
+.. version:: $$VERSION$$
+.. moduleauthor::  Patrick Kelley <patrickbarrettkelley@gmail.com> @patrickbkelley
+
+"""
+import unittest
+
+from policyuniverse.action import iter_bits
+from policyuniverse.catalog import get_catalog
+
+
+class ActionSetTestCase(unittest.TestCase):
+    def setUp(self):
+        self.catalog = get_catalog()
+        self.iam = set(a for a in self.catalog.permissions if a.startswith("iam:"))
+        self.gets = set(a for a in self.catalog.permissions if a.startswith("iam:get"))
+
+    def test_iter_bits(self):
+        self.assertEqual(list(iter_bits(0)), [])
+        self.assertEqual(list(iter_bits(0b1000000101)), [0, 2, 9])
+        self.assertEqual(list(iter_bits(1 << 700)), [700])
+
+    def test_round_trip(self):
+        action_set = self.catalog.action_set(self.iam | {"foo:bar"})
+        self.assertEqual(action_set.to_set(), self.iam | {"foo:bar"})
+        self.assertEqual(action_set.unknown, frozenset(["foo:bar"]))
+        self.assertEqual(len(action_set), len(self.iam) + 1)
+        self.assertIn("iam:getrole", action_set)
+        self.assertIn("foo:bar", action_set)
+        self.assertNotIn("s3:getobject", action_set)
+        self.assertEqual(sorted(action_set), sorted(self.iam | {"foo:bar"}))
+
+    def test_operations(self):
+        iam = self.catalog.action_set(self.iam | {"foo:bar"})
+        gets = self.catalog.action_set(self.gets | {"foo:baz"})
+
+        self.assertEqual((iam | gets).to_set(), self.iam | {"foo:bar", "foo:baz"})
+        self.assertEqual((iam & gets).to_set(), self.gets)
+        self.assertEqual((iam - gets).to_set(), (self.iam - self.gets) | {"foo:bar"})
+        self.assertEqual((~iam).to_set(), self.catalog.permissions.difference(self.iam))
+        self.assertEqual(iam.union(gets), iam | gets)
+        self.assertEqual(iam.intersection(gets), iam & gets)
+        self.assertEqual(iam.difference(gets), iam - gets)
+        self.assertEqual(iam.complement(), ~iam)
+
+    def test_empty_and_universe(self):
+        self.assertFalse(self.catalog.empty())
+        self.assertEqual(self.catalog.universe().to_set(), self.catalog.permissions)
+        self.assertEqual(~self.catalog.universe(), self.catalog.empty())
+
+    def test_range_set(self):
+        start, end = self.catalog.services["iam"]
+        self.assertEqual(self.catalog.range_set(start, end).to_set(), self.iam)
+        self.assertFalse(self.catalog.range_set(end, start))
+
+    def test_immutable_results(self):
+        iam = self.catalog.action_set(self.iam)
+        before = iam.bits
+        iam | self.catalog.action_set(self.gets)
+        ~iam
+        self.assertEqual(iam.bits, before)
+        self.assertEqual(hash(iam), hash(self.catalog.action_set(self.iam)))
+        with self.assertRaises(AttributeError):
+            iam.bits = 0
+        with self.assertRaises(AttributeError):
+            del iam.unknown
+
+    def test_names(self):
+        action_set = self.catalog.action_set(self.gets | {"foo:bar"})
+        self.assertEqual(action_set.names(), tuple(sorted(self.gets | {"foo:bar"})))
+        self.assertIs(action_set.names(), action_set.names())
@@ -37,6 +37,22 @@ class ActionGroupTestCase(unittest.TestCase):
         self.assertEqual(groups["ec2"], {"Write"})
         self.assertEqual(groups["iam"], {"Permissions", "List"})
 
+        groups = categories_for_actions(["iam:thisdoesntexist", "foo:bar"])
+        self.assertEqual(groups, {"iam": {None}, "foo": {None}})
+
+    def test_actions_for_category_in_service(self):
+        from policyuniverse.action_categories import actions_for_category
+
+        kms_permissions = actions_for_category("Permissions", service="kms")
+        self.assertIn("kms:putkeypolicy", kms_permissions)
+        self.assertTrue(all(action.startswith("kms:") for action in kms_permissions))
+        self.assertEqual(
+            kms_permissions,
+            set(a for a in actions_for_category("Permissions") if a.startswith("kms:")),
+        )
+        self.assertEqual(actions_for_category("Permissions", service="nope"), set())
+        self.assertEqual(actions_for_category("NotACategory"), set())
+
     def test_actions_for_category(self):
         from policyuniverse.action_categories import actions_for_category
 
@@ -0,0 +1,140 @@
+#     Copyright 2018 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.tests.test_action_index
+    :platform: Unix
+
+.. version:: $$VERSION$$
+.. moduleauthor::  Patrick Kelley <patrickbarrettkelley@gmail.com> @patrickbkelley
+
+"""
+import unittest
+
+from policyuniverse.action_index import ActionIndex, IndexEntry
+from policyuniverse.expander_minimizer import get_actions_from_statement
+from policyuniverse.policy import Policy
+
+POLICIES = {
+    "admin": {"Statement": [{"Effect": "Allow", "Action": "*", "Resource": "*"}]},
+    "deployer": {
+        "Statement": [
+            {"Effect": "Allow", "Action": ["iam:PassRole", "ec2:Run*"]},
+            {"Effect": "Allow", "Action": "lambda:CreateFunction"},
+        ]
+    },
+    "power-user": {
+        "Statement": [
+            {"Effect": "Allow", "NotAction": ["iam:*", "organizations:*"]},
+            {"Effect": "Allow", "Action": ["iam:GetRole", "foo:bar"]},
+        ]
+    },
+    "no-pass-role": {
+        "Statement": [
+            {"Effect": "Allow", "Action": "iam:*"},
+            {"Effect": "Deny", "Action": "iam:PassRole"},
+        ]
+    },
+    "read-only": {
+        "Statement": {"Effect": "Allow", "Action": ["s3:Get*", "kms:Describe*"]}
+    },
+}
+
+
+def brute_force(policies, pattern, effect="Allow"):
+    expected = set()
+    for key, document in policies.items():
+        for statement in Policy(document).statements:
+            if statement.effect != effect:
+                continue
+            if get_actions_from_statement(statement.statement) & pattern:
+                expected.add(key)
+    return expected
+
+
+class ActionIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.index = ActionIndex(
+            (key, Policy(document)) for key, document in POLICIES.items()
+        )
+
+    def test_lookup(self):
+        self.assertEqual(len(self.index), 5)
+        self.assertEqual(
+            self.index.policies("iam:PassRole"), {"admin", "deployer", "no-pass-role"}
+        )
+        self.assertEqual(
+            self.index.policies("iam:passrole", effect="Deny"), {"no-pass-role"}
+        )
+        self.assertEqual(
+            self.index.policies("s3:getobject"), {"admin", "power-user", "read-only"}
+        )
+        self.assertEqual(self.index.policies("foo:bar"), {"power-user"})
+        self.assertEqual(
+            self.index.entries("lambda:createfunction"),
+            {
+                IndexEntry("admin", 0, "Allow"),
+                IndexEntry("deployer", 1, "Allow"),
+                IndexEntry("power-user", 0, "Allow"),
+            },
+        )
+
+    def test_matches_brute_force(self):
+        for action in [
+            "iam:passrole",
+            "iam:getrole",
+            "s3:putobject",
+            "ec2:runinstances",
+        ]:
+            self.assertEqual(
+                self.index.policies(action), brute_force(POLICIES, {action}), action
+            )
+        iam = get_actions_from_statement({"Action": "iam:*"})
+        self.assertEqual(self.index.policies("iam:*"), brute_force(POLICIES, iam))
+
+    def test_who_can(self):
+        self.assertEqual(self.index.who_can("iam:PassRole"), {"admin", "deployer"})
+        self.assertEqual(
+            self.index.who_can("iam:PassRole", "lambda:CreateFunction"),
+            {"admin", "deployer"},
+        )
+        self.assertEqual(self.index.who_can("iam:PassRole", "s3:GetObject"), {"admin"})
+
+    def test_category(self):
+        self.assertEqual(
+            self.index.policies_for_category("Permissions", service="kms"),
+            {"admin", "power-user"},
+        )
+        self.assertEqual(
+            self.index.policies_for_category("Read", service="kms"),
+            {"admin", "power-user", "read-only"},
+        )
+
+    def test_incremental_updates(self):
+        self.index.remove("admin")
+        self.assertNotIn("admin", self.index)
+        self.assertEqual(self.index.who_can("iam:PassRole"), {"deployer"})
+
+        self.index.add("deployer", Policy({"Statement": []}))
+        self.assertEqual(self.index.who_can("iam:PassRole"), set())
+        self.index.add("admin", Policy(POLICIES["admin"]))
+        self.assertEqual(self.index.who_can("iam:PassRole"), {"admin"})
+
+        for key in list(POLICIES):
+            self.index.remove(key)
+        self.assertEqual(len(self.index), 0)
+        for effect_index in self.index._effects.values():
+            self.assertFalse(effect_index.postings)
+            self.assertFalse(effect_index.excluded)
+            self.assertFalse(effect_index.dense)
+            self.assertFalse(effect_index.unknown)
@@ -19,10 +19,11 @@
 .. moduleauthor::  Mike Grima <mgrima@netflix.com>
 
 """
+import importlib.util
 import unittest
 
 from policyuniverse import logger
-from policyuniverse.arn import ARN
+from policyuniverse.arn import ARN, parse_many
 
 
 class ARNTestCase(unittest.TestCase):
@@ -103,3 +104,57 @@ class ARNTestCase(unittest.TestCase):
             arn_obj = ARN(accnt)
 
             self.assertTrue(arn_obj.error)
+
+    def test_fields(self):
+        arn = ARN("arn:aws:iam::012345678910:root")
+        self.assertEqual(arn.partition, "aws")
+        self.assertEqual(arn.tech, "iam")
+        self.assertEqual(arn.region, "")
+        self.assertEqual(arn.account_number, "012345678910")
+        self.assertEqual(arn.name, "root")
+        self.assertTrue(arn.root)
+        self.assertFalse(arn.service)
+        self.assertFalse(arn.error)
+
+        service = ARN("lambda.amazonaws.com")
+        self.assertEqual(service.tech, "lambda")
+        self.assertTrue(service.service)
+        self.assertIsNone(service.account_number)
+        self.assertFalse(service.root)
+
+    def test_parse_is_interned_and_immutable(self):
+        arn = ARN.parse("arn:aws:iam::012345678910:root")
+        self.assertIs(arn, ARN.parse("arn:aws:iam::012345678910:root"))
+        self.assertIsNot(arn, ARN("arn:aws:iam::012345678910:root"))
+        self.assertTrue(ARN.parse("not an arn").error)
+        self.assertFalse(hasattr(arn, "__dict__"))
+        with self.assertRaises(AttributeError):
+            arn.account_number = "*"
+        with self.assertRaises(AttributeError):
+            del arn.name
+
+    def test_parse_many(self):
+        raws = [
+            "arn:aws:iam::012345678910:root",
+            "lambda.amazonaws.com",
+            "012345678912",
+            "not an arn",
+            "arn:aws:iam::012345678910:root",
+        ]
+        columns = parse_many(raws)
+        self.assertEqual(columns.arn, raws)
+        for index, raw in enumerate(raws):
+            arn = ARN(raw)
+            for field in columns._fields:
+                self.assertEqual(getattr(columns, field)[index], getattr(arn, field))
+        self.assertEqual(parse_many([]).account_number, [])
+        empty = parse_many([])
+        empty.arn.append("x")
+        self.assertEqual(empty.tech, [])
+
+    @unittest.skipUnless(importlib.util.find_spec("numpy"), "numpy is not installed")
+    def test_parse_many_numpy(self):
+        columns = parse_many(["arn:aws:iam::012345678910:root", "foo"], numpy=True)
+        self.assertEqual(columns.error.dtype, bool)
+        self.assertEqual(list(columns.error), [False, True])
+        self.assertEqual(list(columns.account_number), ["012345678910", None])
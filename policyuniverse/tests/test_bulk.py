@@ -0,0 +1,84 @@
+#     Copyright 2018 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.tests.test_bulk
+    :platform: Unix
+
+.. version:: $$VERSION$$
+.. moduleauthor::  Patrick Kelley <patrickbarrettkelley@gmail.com> @patrickbkelley
+
+"""
+import unittest
+
+from policyuniverse.bulk import analyze
+from policyuniverse.policy import Policy
+
+POLICIES = [
+    {
+        "Statement": {
+            "Effect": "Allow",
+            "Principal": "*",
+            "Action": ["rds:*"],
+            "Resource": "*",
+            "Condition": {"IpAddress": {"AWS:SourceIP": ["0.0.0.0/0"]}},
+        }
+    },
+    {
+        "Statement": [
+            {
+                "Effect": "Allow",
+                "Principal": {"AWS": "arn:aws:iam::012345678910:root"},
+                "Action": ["s3:getobject", "sqs:sendmessage"],
+                "Resource": "*",
+            }
+        ]
+    },
+    {"Statement": [{"Effect": "Allow", "Principal": "*", "Action": "s3:*"}]},
+    {"Statement": "not a statement"},
+]
+
+
+class BulkTestCase(unittest.TestCase):
+    def test_serial(self):
+        results = list(analyze(POLICIES * 3, workers=0, chunksize=2))
+        self.assertEqual([result.index for result in results], list(range(12)))
+
+        self.assertTrue(results[0].internet_accessible)
+        self.assertEqual(
+            results[0].whos_allowed, (("cidr", "0.0.0.0/0"), ("principal", "*"))
+        )
+        self.assertEqual(
+            results[0].action_summary,
+            dict(
+                (service, tuple(sorted(categories)))
+                for service, categories in Policy(POLICIES[0]).action_summary().items()
+            ),
+        )
+        self.assertFalse(results[1].internet_accessible)
+        self.assertEqual(
+            results[1].action_summary, {"s3": ("Read",), "sqs": ("Write",)}
+        )
+        self.assertIsNone(results[0].error)
+        self.assertIsNone(results[3].internet_accessible)
+        self.assertIsNotNone(results[3].error)
+
+    def test_policy_objects(self):
+        documents = list(analyze(POLICIES[:3], workers=0))
+        policies = list(analyze([Policy(policy) for policy in POLICIES[:3]], workers=0))
+        self.assertEqual(documents, policies)
+
+    def test_pool_matches_serial(self):
+        serial = list(analyze(POLICIES * 5, workers=0, chunksize=3))
+        pooled = list(analyze(POLICIES * 5, workers=2, chunksize=3))
+        self.assertEqual(pooled, serial)
@@ -0,0 +1,231 @@
+#     Copyright 2018 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.tests.test_catalog
+    :platform: Unix
+
+.. version:: $$VERSION$$
+.. moduleauthor::  Patrick Kelley <patrickbarrettkelley@gmail.com> @patrickbkelley
+
+"""
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+
+import policyuniverse
+from policyuniverse.action import build_service_actions_from_service_data
+from policyuniverse.action_categories import build_action_categories_from_service_data
+from policyuniverse.catalog import (
+    _SNAPSHOT_MAGIC,
+    SNAPSHOT_FORMAT,
+    build_catalog,
+    get_catalog,
+    get_service_data,
+    load_snapshot,
+    service_actions,
+    write_snapshot,
+)
+
+# Runs in a fresh interpreter so nothing else in the test session has already
+# loaded the catalog.
+IMPORT_CHECK = textwrap.dedent(
+    """
+    import sys
+
+    opened = []
+    if hasattr(sys, "addaudithook"):
+        sys.addaudithook(
+            lambda event, args: event == "open"
+            and str(args[0]).endswith("data.json")
+            and opened.append(args[0])
+        )
+
+    import policyuniverse
+    import policyuniverse.arn
+    import policyuniverse.organization
+    from policyuniverse import catalog
+
+    assert not catalog.is_loaded(), "catalog loaded at import time"
+    assert "all_permissions" not in vars(policyuniverse)
+    assert not opened, opened
+    """
+)
+
+
+class CatalogTestCase(unittest.TestCase):
+    def test_import_does_not_read_data_file(self):
+        subprocess.check_call([sys.executable, "-c", IMPORT_CHECK])
+
+    def test_legacy_names(self):
+        from policyuniverse import _action_categories, all_permissions, service_data
+
+        catalog = get_catalog()
+        self.assertIs(all_permissions, catalog.permissions)
+        self.assertIs(_action_categories, catalog.action_categories)
+        self.assertIn("iam:putrolepolicy", all_permissions)
+        self.assertEqual(_action_categories["iam:putrolepolicy"], "Permissions")
+        self.assertEqual(service_data["IAM"]["prefix"], "iam")
+
+    def test_unknown_attribute(self):
+        with self.assertRaises(AttributeError):
+            policyuniverse.does_not_exist
+
+    def test_build_catalog(self):
+        service_data = get_service_data()
+        catalog = build_catalog(service_data)
+        self.assertEqual(
+            catalog.permissions, build_service_actions_from_service_data(service_data)
+        )
+        self.assertEqual(
+            catalog.action_categories,
+            build_action_categories_from_service_data(service_data),
+        )
+        self.assertEqual(list(catalog.actions), sorted(catalog.actions))
+        start, end = catalog.services["iam"]
+        self.assertTrue(all(a.startswith("iam:") for a in catalog.actions[start:end]))
+        self.assertFalse(catalog.actions[end].startswith("iam:"))
+
+    def test_service_actions(self):
+        kms = service_actions("kms")
+        self.assertIsInstance(kms, frozenset)
+        self.assertIn("kms:decrypt", kms)
+        self.assertTrue(all(action.startswith("kms:") for action in kms))
+        self.assertEqual(
+            kms, set(a for a in get_catalog().permissions if a.startswith("kms:"))
+        )
+        self.assertEqual(
+            get_catalog().sorted_service_actions("kms"), tuple(sorted(kms))
+        )
+        self.assertEqual(service_actions("thistechdoesntexist"), frozenset())
+        self.assertEqual(get_catalog().sorted_service_actions("nope"), ())
+
+    def test_category_index(self):
+        catalog = get_catalog()
+        categories = catalog.action_categories
+        kms = catalog.service_actions("kms")
+        histogram = catalog.category_histograms["kms"]
+        self.assertEqual(sum(histogram.values()), len(kms))
+        for category, count in histogram.items():
+            self.assertEqual(
+                count, len([a for a in kms if categories[a] == category]), category
+            )
+
+        self.assertEqual(catalog.services_in(catalog.action_set(kms).bits), ["kms"])
+        self.assertEqual(catalog.services_in(0), [])
+        self.assertEqual(
+            set(catalog.services_in(catalog.all_bits)),
+            set(s for s, (start, end) in catalog.services.items() if end > start),
+        )
+
+        cases = [kms, set(["kms:decrypt"]), catalog.permissions, set()]
+        cases.append(catalog.expand("kms:describe*").to_set())
+        cases.append(catalog.expand("kms:*key*").to_set())
+        for actions in cases:
+            bits = catalog.action_set(actions).bits
+            self.assertEqual(
+                catalog.service_categories("kms", bits),
+                set(categories[a] for a in actions if a.startswith("kms:")),
+            )
+
+
+class SnapshotTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "catalog.bin")
+        self.catalog = build_catalog(get_service_data(), version="abc123")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        write_snapshot(self.catalog, path=self.path)
+        loaded = load_snapshot("abc123", path=self.path)
+        self.assertEqual(loaded.version, "abc123")
+        self.assertEqual(loaded.actions, self.catalog.actions)
+        self.assertEqual(loaded.services, self.catalog.services)
+        self.assertEqual(loaded.action_categories, self.catalog.action_categories)
+
+    def test_stale(self):
+        write_snapshot(self.catalog, path=self.path)
+        self.assertIsNone(load_snapshot("def456", path=self.path))
+
+    def test_other_format(self):
+        write_snapshot(self.catalog, path=self.path)
+        with open(self.path, "rb+") as outfile:
+            outfile.seek(len(_SNAPSHOT_MAGIC))
+            outfile.write(struct.pack("<I", SNAPSHOT_FORMAT + 1))
+        self.assertIsNone(load_snapshot("abc123", path=self.path))
+
+    def test_inconsistent(self):
+        self.catalog.categories = self.catalog.categories[:-1]
+        write_snapshot(self.catalog, path=self.path)
+        self.assertIsNone(load_snapshot("abc123", path=self.path))
+
+    def test_missing_or_corrupt(self):
+        self.assertIsNone(load_snapshot("abc123", path=self.path))
+        with open(self.path, "wb") as outfile:
+            outfile.write(b"not a snapshot")
+        self.assertIsNone(load_snapshot("abc123", path=self.path))
+        write_snapshot(self.catalog, path=self.path)
+        with open(self.path, "rb+") as outfile:
+            outfile.truncate(1000)
+        self.assertIsNone(load_snapshot("abc123", path=self.path))
+
+
+class ExpandTestCase(unittest.TestCase):
+    PATTERNS = [
+        "*",
+        "s3:*",
+        "s3:get*",
+        "ec2:describe*",
+        "iam:*policy*",
+        "swf:*activitytaskc*",
+        "s3:getobjec?",
+        "s3:getobject",
+        "s3:getobject*",
+        "s?:get*",
+        "*:list*",
+        "thistechdoesntexist:*",
+        "iam:thisdoesntexist",
+        "*policy",
+    ]
+
+    def test_expand_matches_fnmatch(self):
+        import fnmatch
+
+        catalog = get_catalog()
+        for pattern in self.PATTERNS:
+            self.assertEqual(
+                catalog.expand(pattern).to_set(),
+                set(fnmatch.filter(catalog.permissions, pattern)),
+                pattern,
+            )
+
+    def test_expand_is_not_fnmatch(self):
+        # IAM has no character classes; '[' is a literal.
+        catalog = get_catalog()
+        self.assertFalse(catalog.expand("iam:get[ru]*"))
+        self.assertTrue(catalog.expand("iam:get?ole"))
+
+    def test_prefix_range(self):
+        catalog = get_catalog()
+        self.assertEqual(catalog.prefix_range("iam:"), catalog.services["iam"])
+        self.assertEqual(catalog.prefix_range(""), (0, len(catalog.actions)))
+        start, end = catalog.prefix_range("zzzz")
+        self.assertEqual(start, end)
@@ -22,7 +22,7 @@
 import unittest
 from collections.abc import Sequence
 
-from policyuniverse.common import ensure_array, is_array
+from policyuniverse.common import LRUCache, ensure_array, is_array
 
 
 class CustomSequence(Sequence):
@@ -60,3 +60,35 @@ class CommonTestCase(unittest.TestCase):
     def test_ensure_array_non_sequence_input(self):
         for obj in ("abc", b"abc", 1, {"a": 1}):
             self.assertListEqual(ensure_array(obj), [obj])
+
+
+class LRUCacheTestCase(unittest.TestCase):
+    def test_hits_misses_evictions(self):
+        cache = LRUCache(maxsize=2)
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)  # evicts "b", the least recently used
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.get("b", "default"), "default")
+        self.assertEqual(cache.info(), (1, 2, 1, 2, 2))
+
+        cache.resize(1)
+        self.assertEqual(len(cache), 1)
+        self.assertIn("c", cache)
+        self.assertEqual(cache.info().evictions, 2)
+
+        cache.clear()
+        self.assertEqual(cache.info(), (0, 0, 0, 1, 0))
+
+    def test_disabled_and_unbounded(self):
+        cache = LRUCache(maxsize=0)
+        cache.put("a", 1)
+        self.assertEqual(len(cache), 0)
+
+        cache = LRUCache(maxsize=None)
+        for i in range(1000):
+            cache.put(i, i)
+        self.assertEqual(cache.info().currsize, 1000)
+        self.assertEqual(cache.info().evictions, 0)
@@ -20,18 +20,25 @@
 
 """
 import copy
+import json
 import unittest
 
+from policyuniverse.catalog import get_catalog
 from policyuniverse.expander_minimizer import (
     _expand_wildcard_action,
     _get_desired_actions_from_statement,
     _get_prefixes_for_action,
+    _prefix_tries,
     all_permissions,
+    compact_policy,
+    expand_actions,
     expand_minimize_over_policies,
     expand_policy,
+    expansion_cache,
     get_actions_from_statement,
     minimize_policy,
     minimize_statement_actions,
+    policy_size,
 )
 
 WILDCARD_ACTION_1 = "swf:res*"
@@ -149,6 +156,35 @@ AUTOSCALING_PERMISSIONS = sorted(
 )
 
 
+def legacy_denied_prefixes(desired_actions):
+    denied_prefixes = set()
+    for denied_action in set(all_permissions) - desired_actions:
+        denied_prefixes.update(_get_prefixes_for_action(denied_action))
+    return denied_prefixes
+
+
+def legacy_minimize_statement_actions(desired_actions, denied_prefixes, minchars=None):
+    """The denied-prefix-set minimizer the trie implementation replaced."""
+    minimized_actions = set()
+    for action in desired_actions:
+        if action in denied_prefixes:
+            minimized_actions.add(action)
+            continue
+        prefixes = _get_prefixes_for_action(action)
+        for prefix in prefixes:
+            permission = prefix.split(":")[1]
+            if minchars and len(permission) < int(minchars) and permission != "":
+                continue
+            if prefix not in denied_prefixes:
+                if prefix not in desired_actions:
+                    prefix = "{}*".format(prefix)
+                minimized_actions.add(prefix)
+                break
+        else:
+            minimized_actions.add(prefixes[-1])
+    return sorted(minimized_actions)
+
+
 def dc(o):
     """
     Some of the testing methods modify the datastructure you pass into them.
@@ -212,6 +248,95 @@ class TestMethods(unittest.TestCase):
         result = _expand_wildcard_action("ec2:DescribeInstances")
         self.assertEqual(result, ["ec2:describeinstances"])
 
+    def test_expansion_cache(self):
+        expansion_cache.clear()
+        first = _expand_wildcard_action(["autoscaling:*"])
+        second = _expand_wildcard_action(["AutoScaling:*"])
+        self.assertEqual(first, second)
+        info = expansion_cache.info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (1, 1, 1))
+
+        # Mutating a result must not leak into later expansions.
+        first.append("autoscaling:bogus")
+        self.assertEqual(
+            sorted(_expand_wildcard_action("autoscaling:*")), AUTOSCALING_PERMISSIONS
+        )
+
+        maxsize = expansion_cache.maxsize
+        try:
+            expansion_cache.resize(1)
+            _expand_wildcard_action(["swf:*"])
+            self.assertEqual(expansion_cache.info().evictions, 1)
+        finally:
+            expansion_cache.resize(maxsize)
+            expansion_cache.clear()
+
+    def test_expand_actions(self):
+        patterns = [
+            "s3:Get*",
+            "s3:get*",
+            "s3:*Object",
+            "s3:*objectacl",
+            "s3:zzz*",
+            "s3:PutObject",
+            "ec2:Describe*",
+            "ec2:*Tags",
+            "iam:*policy*",
+            "iam:get?ole*",
+            "*:listtagsforresource",
+            "thistechdoesntexist:*",
+            "thistechdoesntexist:foo*",
+            "ec2:thispermissiondoesntexist",
+            "swf:res*",
+        ]
+        expected = set()
+        for pattern in patterns:
+            expected.update(_expand_wildcard_action(pattern))
+        self.assertEqual(expand_actions(patterns), expected)
+        self.assertIn("s3:zzz*", expected)
+        self.assertIn("thistechdoesntexist:foo*", expected)
+        self.assertEqual(expand_actions(["*"]), set(all_permissions))
+        self.assertEqual(expand_actions([]), set())
+        self.assertEqual(expand_actions("S3:GetObject"), {"s3:getobject"})
+        self.assertEqual(expand_actions("swf:res*"), set(EXPANDED_ACTIONS_1))
+
+    def test_minimize_statement_actions_matches_legacy(self):
+        statements = [
+            ["s3:*"],
+            ["s3:get*", "s3:list*", "ec2:describe*"],
+            ["iam:*policy*", "iam:passrole", "sts:assumerole"],
+            ["swf:res*"],
+            ["s3:getobject", "s3:getobjectacl", "s3:putobject", "kms:decrypt"],
+            ["autoscaling:*", "elasticloadbalancing:describe*", "logs:create*"],
+            sorted(all_permissions)[::31],
+        ]
+        for actions in statements:
+            statement = dict(Effect="Allow", Action=actions, Resource="*")
+            desired_actions = _get_desired_actions_from_statement(statement)
+            denied_prefixes = legacy_denied_prefixes(desired_actions)
+            for minchars in (None, 3, 6):
+                self.assertEqual(
+                    minimize_statement_actions(dc(statement), minchars=minchars),
+                    legacy_minimize_statement_actions(
+                        desired_actions, denied_prefixes, minchars=minchars
+                    ),
+                    (actions[:5], minchars),
+                )
+
+    def test_minimize_only_indexes_touched_services(self):
+        _prefix_tries.clear()
+        statement = dict(
+            Effect="Allow", Action=["s3:get*", "sqs:sendmessage"], Resource="*"
+        )
+        first = minimize_statement_actions(dc(statement))
+        version = get_catalog().version
+        self.assertEqual(_prefix_tries.info().currsize, 2)
+        self.assertIn((version, "s3"), _prefix_tries)
+        self.assertIn((version, "sqs"), _prefix_tries)
+        misses = _prefix_tries.info().misses
+        self.assertEqual(minimize_statement_actions(dc(statement)), first)
+        self.assertEqual(_prefix_tries.info().misses, misses)
+
     def test_get_desired_actions_from_statement(self):
         result = _get_desired_actions_from_statement(
             dc(WILDCARD_POLICY_1["Statement"][0])
@@ -260,3 +385,212 @@ class TestMethods(unittest.TestCase):
     def test_minimize_statement_actions(self):
         statement = dict(Effect="Deny")
         self.assertRaises(Exception, minimize_statement_actions, statement)
+
+
+class MinimizeToSizeTestCase(unittest.TestCase):
+    def setUp(self):
+        self.policy = expand_policy(
+            {
+                "Statement": [
+                    {"Action": ["ec2:describe*"], "Resource": "*", "Effect": "Allow"},
+                    {"Action": ["swf:res*"], "Resource": "*", "Effect": "Allow"},
+                    {"Action": ["s3:get*"], "Resource": "*", "Effect": "Allow"},
+                ]
+            }
+        )
+
+    def test_policy_size(self):
+        statement = {"Action": ["s3:getobject"], "Effect": "Allow"}
+        self.assertEqual(
+            policy_size(statement), len('{"Action":["s3:getobject"],"Effect":"Allow"}')
+        )
+        self.assertEqual(
+            policy_size(statement, size_mode="pretty"),
+            len(json.dumps(statement, indent=2)),
+        )
+        self.assertRaises(ValueError, policy_size, statement, size_mode="bogus")
+
+    def test_already_fits(self):
+        original = dc(self.policy)
+        policy, size = minimize_policy(dc(self.policy), max_size=10**6)
+        self.assertEqual(policy, original)
+        self.assertEqual(size, policy_size(original))
+
+    def test_stops_once_under_limit(self):
+        statements = self.policy["Statement"]
+        ec2 = policy_size(statements[0])
+        # Minimizing the largest statement (ec2) is enough to fit.
+        max_size = policy_size(self.policy) - ec2 + 200
+        policy, size = minimize_policy(dc(self.policy), max_size=max_size)
+
+        self.assertLessEqual(size, max_size)
+        self.assertEqual(size, policy_size(policy))
+        self.assertEqual(len(policy["Statement"][0]["Action"]), 1)
+        self.assertEqual(policy["Statement"][1], statements[1])
+        self.assertEqual(policy["Statement"][2], statements[2])
+
+    def test_does_not_fit(self):
+        policy, size = minimize_policy(dc(self.policy), max_size=10, minchars=3)
+        self.assertGreater(size, 10)
+        self.assertEqual(size, policy_size(policy))
+        self.assertEqual(policy["Statement"][1]["Action"], ["swf:res*"])
+
+    def test_pretty_size_mode(self):
+        policy, size = minimize_policy(dc(self.policy), max_size=0, size_mode="pretty")
+        self.assertEqual(size, len(json.dumps(policy, indent=2)))
+
+    def test_skips_deny_and_notaction(self):
+        deny = {"Action": ["iam:*" + "x" * 2000], "Resource": "*", "Effect": "Deny"}
+        not_action = {
+            "NotAction": ["iam:*" + "x" * 2000],
+            "Resource": "*",
+            "Effect": "Allow",
+        }
+        self.policy["Statement"][:0] = [dc(deny), dc(not_action)]
+        for max_size in (100, 10):
+            policy, size = minimize_policy(dc(self.policy), max_size=max_size)
+            self.assertEqual(size, policy_size(policy))
+            self.assertEqual(policy["Statement"][0], deny)
+            self.assertEqual(policy["Statement"][1], not_action)
+            self.assertEqual(policy["Statement"][3]["Action"], ["swf:res*"])
+
+
+class CompactPolicyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.policy = {
+            "Version": "2012-10-17",
+            "Statement": [
+                {
+                    "Sid": "a",
+                    "Effect": "Allow",
+                    "Action": "s3:GetObject",
+                    "Resource": "*",
+                },
+                {"Effect": "Allow", "NotAction": "iam:*", "Resource": "*"},
+                {
+                    "Sid": "b",
+                    "Effect": "Allow",
+                    "Action": ["s3:get*", "ec2:describeinstances"],
+                    "Resource": "*",
+                },
+                {"Effect": "Deny", "Action": "s3:deletebucket", "Resource": "*"},
+                {
+                    "Effect": "Allow",
+                    "Action": ["ec2:DescribeInstances", "s3:listbucket"],
+                    "Resource": "arn:aws:s3:::bucket",
+                },
+                {"Effect": "Allow", "NotAction": "iam:*", "Resource": "*"},
+            ],
+        }
+
+    def test_compact_policy(self):
+        original = dc(self.policy)
+        compacted = compact_policy(self.policy)
+        self.assertEqual(self.policy, original)
+
+        statements = compacted["Statement"]
+        self.assertEqual(len(statements), 5)
+        self.assertEqual(
+            statements[0],
+            {
+                "Sid": "a",
+                "Effect": "Allow",
+                "Action": ["s3:get*", "ec2:describeinstances"],
+                "Resource": "*",
+            },
+        )
+        self.assertIs(statements[1], self.policy["Statement"][1])
+        self.assertIs(statements[2], self.policy["Statement"][3])
+        self.assertIs(statements[3], self.policy["Statement"][4])
+        self.assertIs(statements[4], self.policy["Statement"][5])
+
+        self.assertEqual(
+            expand_policy(compacted)["Statement"][0]["Action"],
+            sorted(
+                get_actions_from_statement(self.policy["Statement"][0])
+                | get_actions_from_statement(self.policy["Statement"][2])
+            ),
+        )
+
+    def test_compact_policy_minimize(self):
+        compacted = compact_policy(self.policy, minimize=True, minchars=3)
+        self.assertEqual(self.policy["Statement"][2]["Action"][0], "s3:get*")
+        merged = compacted["Statement"][0]
+        self.assertEqual(
+            get_actions_from_statement(merged),
+            expand_actions(["s3:get*", "ec2:describeinstances"]),
+        )
+        self.assertEqual(compacted["Statement"][2], self.policy["Statement"][3])
+
+    def test_compact_policy_normalizes_merge_keys(self):
+        policy = {
+            "Statement": [
+                {
+                    "Effect": "Allow",
+                    "Action": ["s3:getobject", "s3:get*"],
+                    "Resource": "x",
+                    "Principal": {"AWS": ["a", "b"]},
+                    "Condition": {"StringEquals": {"aws:SourceVpc": ["v1", "v2"]}},
+                },
+                {
+                    "Effect": "Allow",
+                    "Action": ["s3:getobjec*", "s3:list*", "s3:listbucket"],
+                    "Resource": ["x"],
+                    "Principal": {"AWS": ["b", "a"]},
+                    "Condition": {"StringEquals": {"aws:sourcevpc": ["v2", "v1"]}},
+                },
+            ]
+        }
+        statements = compact_policy(policy)["Statement"]
+        self.assertEqual(len(statements), 1)
+        self.assertEqual(statements[0]["Action"], ["s3:get*", "s3:list*"])
+
+
+class ShallowExpandPolicyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.policy = {
+            "Version": "2012-10-17",
+            "Statement": [
+                {
+                    "Effect": "Allow",
+                    "Action": ["swf:res*"],
+                    "Resource": ["arn:aws:s3:::bucket/*"],
+                    "Condition": {"Bool": {"aws:SecureTransport": "true"}},
+                },
+                {"Effect": "Deny", "Action": "s3:*", "Resource": "*"},
+                {"Effect": "Allow", "Action": ["SWF:Res*"], "Resource": "*"},
+                {"Effect": "Allow", "NotAction": "iam:*", "Resource": "*"},
+            ],
+        }
+
+    def test_matches_deepcopy(self):
+        original = dc(self.policy)
+        expanded = expand_policy(self.policy)
+        shallow = expand_policy(self.policy, shallow=True)
+        self.assertEqual(self.policy, original)
+        self.assertEqual(json.dumps(shallow), json.dumps(expanded))
+
+    def test_structural_sharing(self):
+        shallow = expand_policy(self.policy, shallow=True)
+        statements = shallow["Statement"]
+        self.assertIsNot(statements, self.policy["Statement"])
+        self.assertIsNot(statements[0], self.policy["Statement"][0])
+        self.assertIs(
+            statements[0]["Resource"], self.policy["Statement"][0]["Resource"]
+        )
+        self.assertIs(
+            statements[0]["Condition"], self.policy["Statement"][0]["Condition"]
+        )
+        self.assertIs(statements[1], self.policy["Statement"][1])
+        self.assertIsInstance(statements[0]["Action"], tuple)
+        self.assertIs(statements[0]["Action"], statements[2]["Action"])
+        self.assertNotIn("NotAction", statements[3])
+        self.assertIn("NotAction", self.policy["Statement"][3])
+
+    def test_inplace(self):
+        expanded = expand_policy(dc(self.policy))
+        statements = self.policy["Statement"]
+        result = expand_policy(self.policy, inplace=True)
+        self.assertIs(result, self.policy)
+        self.assertIs(result["Statement"], statements)
+        self.assertEqual(json.dumps(result), json.dumps(expanded))
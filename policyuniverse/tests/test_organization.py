@@ -145,3 +145,20 @@ class OrganizationTestCase(unittest.TestCase):
         logger.info("Testing path with root * and trailing path: {}".format(org_path))
         organization_obj = Organization(org_path)
         self.assertFalse(organization_obj.valid_for_all_ous)
+
+    def test_ou_path_is_per_instance(self):
+        first = Organization("o-a1b2c3d4e5/r-ab12/ou-ab12-11111111/ou-ab12-22222222")
+        second = Organization("o-a1b2c3d4e5/r-ab12/ou-ab12-33333333")
+        self.assertEqual(first.ou_path, ("ou-ab12-11111111", "ou-ab12-22222222"))
+        self.assertEqual(second.ou_path, ("ou-ab12-33333333",))
+        self.assertEqual(Organization("o-a1b2c3d4e5").ou_path, ())
+
+    def test_parse_is_interned_and_immutable(self):
+        organization = Organization.parse("o-a1b2c3d4e5/r-ab12/ou-*")
+        self.assertIs(organization, Organization.parse("o-a1b2c3d4e5/r-ab12/ou-*"))
+        self.assertTrue(organization.valid_for_child_ous)
+        self.assertFalse(hasattr(organization, "__dict__"))
+        with self.assertRaises(AttributeError):
+            organization.error = True
+        with self.assertRaises(AttributeError):
+            del organization.root
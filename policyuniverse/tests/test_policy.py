@@ -19,6 +19,7 @@
 .. moduleauthor::  Patrick Kelley <patrick@netflix.com>
 
 """
+import copy
 import json
 import unittest
 
@@ -284,3 +285,70 @@ class PolicyTestCase(unittest.TestCase):
         policy = Policy(policy07)
         self.assertSetEqual(policy.principals, set("*"))
         self.assertIs(policy.is_internet_accessible(), True)
+
+    def test_cached_immutable_results(self):
+        policy = Policy(policy01)
+        self.assertIs(policy.principals, policy.principals)
+        self.assertIs(policy.condition_entries, policy.condition_entries)
+        self.assertIs(policy.whos_allowed(), policy.whos_allowed())
+        self.assertIs(policy.action_summary(), policy.action_summary())
+        self.assertIs(
+            policy.internet_accessible_actions(), policy.internet_accessible_actions()
+        )
+        self.assertIsInstance(policy.principals, frozenset)
+        self.assertIsInstance(policy.whos_allowed(), frozenset)
+        self.assertEqual(policy.internet_accessible_actions(), {"rds:*"})
+        with self.assertRaises(TypeError):
+            policy.action_summary()["rds"] = frozenset()
+        with self.assertRaises(AttributeError):
+            policy.action_summary()["rds"].add("Write")
+        self.assertEqual(policy.action_summary()["iam"], frozenset())
+        self.assertNotIn("iam", policy.action_summary())
+        self.assertIsNone(policy.action_summary().get("iam"))
+
+    def test_digest(self):
+        document = {
+            "Version": "2012-10-17",
+            "Statement": [
+                {
+                    "Sid": "Read",
+                    "Effect": "Allow",
+                    "Principal": {"AWS": ["arn:aws:iam::012345678910:root", "*"]},
+                    "Action": ["s3:GetObject", "s3:ListBucket", "s3:getobject"],
+                    "Resource": "arn:aws:s3:::bucket/*",
+                    "Condition": {"StringEquals": {"AWS:SourceVpc": "vpc-1234"}},
+                },
+                {"Effect": "Deny", "Action": "s3:DeleteBucket", "Resource": "*"},
+            ],
+        }
+        equivalent = {
+            "Statement": [
+                {"Resource": ["*"], "Action": ["s3:deletebucket"], "Effect": "Deny"},
+                {
+                    "Condition": {"StringEquals": {"aws:sourcevpc": ["vpc-1234"]}},
+                    "Resource": ["arn:aws:s3:::bucket/*"],
+                    "Action": ["s3:listbucket", "s3:getobject"],
+                    "Principal": {"AWS": ["*", "arn:aws:iam::012345678910:root"]},
+                    "Effect": "Allow",
+                    "Sid": "Other",
+                },
+            ],
+            "Version": "2012-10-17",
+        }
+        self.assertEqual(Policy(document).digest, Policy(equivalent).digest)
+        self.assertEqual(len(Policy(document).digest), 64)
+
+        different = copy.deepcopy(equivalent)
+        different["Statement"][1]["Resource"] = ["arn:aws:s3:::Bucket/*"]
+        self.assertNotEqual(Policy(document).digest, Policy(different).digest)
+
+        different = copy.deepcopy(equivalent)
+        different["Statement"][1]["Condition"]["StringEquals"][
+            "aws:sourcevpc"
+        ] = "VPC-1234"
+        self.assertNotEqual(Policy(document).digest, Policy(different).digest)
+
+        self.assertEqual(
+            Policy(policy01).digest,
+            Policy(dict(policy01, Statement=[policy01["Statement"]])).digest,
+        )
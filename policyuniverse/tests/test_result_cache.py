@@ -0,0 +1,99 @@
+#     Copyright 2018 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.tests.test_result_cache
+    :platform: Unix
+
+.. version:: $$VERSION$$
+.. moduleauthor::  Patrick Kelley <patrickbarrettkelley@gmail.com> @patrickbkelley
+
+"""
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from policyuniverse import result_cache
+from policyuniverse.bulk import analyze
+from policyuniverse.expander_minimizer import expand_policy
+from policyuniverse.result_cache import ResultCache
+
+from .test_bulk import POLICIES
+
+
+class ResultCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = ResultCache(os.path.join(self.directory, "results.db"))
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.directory)
+
+    def test_analyze(self):
+        expected = list(analyze(POLICIES, workers=0))
+        cold = [self.cache.analyze(p, index=i) for i, p in enumerate(POLICIES)]
+        self.assertEqual(len(self.cache), 3)
+        warm = [self.cache.analyze(p, index=i) for i, p in enumerate(POLICIES)]
+        self.assertEqual(cold, expected)
+        self.assertEqual(warm, expected)
+
+        # Equivalent documents share a result.
+        reordered = {
+            "Statement": [dict(reversed(list(POLICIES[1]["Statement"][0].items())))]
+        }
+        self.assertEqual(self.cache.analyze(reordered, index=1), expected[1])
+        self.assertEqual(len(self.cache), 3)
+
+    def test_versions(self):
+        self.cache.analyze(POLICIES[0])
+        library_version = result_cache.LIBRARY_VERSION
+        result_cache.LIBRARY_VERSION = "other"
+        try:
+            self.assertIsNone(self.cache.get("analysis", "missing"))
+            self.cache.analyze(POLICIES[0])
+            self.assertEqual(len(self.cache), 2)
+            self.cache.evict()
+            self.assertEqual(len(self.cache), 1)
+        finally:
+            result_cache.LIBRARY_VERSION = library_version
+
+    def test_eviction(self):
+        cache = ResultCache(self.cache.path, max_entries=2, evict_every=1)
+        for number in range(5):
+            cache.put("test", str(number), number)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get("test", "4"), 4)
+        self.assertIsNone(cache.get("test", "0"))
+
+        expired = ResultCache(self.cache.path, max_age=-1)
+        self.assertIsNone(expired.get("test", "4"))
+        expired.evict()
+        self.assertEqual(len(cache), 0)
+
+    def test_expand_policy(self):
+        expected = expand_policy(POLICIES[1])
+        self.assertEqual(self.cache.expand_policy(POLICIES[1]), expected)
+        self.assertEqual(self.cache.expand_policy(POLICIES[1]), expected)
+        self.assertEqual(len(self.cache), 1)
+
+    def test_worker_processes(self):
+        self.assertIsNone(pickle.loads(pickle.dumps(self.cache))._connection)
+        expected = list(analyze(POLICIES * 4, workers=0))
+        cold = list(analyze(POLICIES * 4, workers=2, chunksize=2, cache=self.cache))
+        warm = list(analyze(POLICIES * 4, workers=2, chunksize=2, cache=self.cache))
+        self.assertEqual(cold, expected)
+        self.assertEqual(warm, expected)
+        self.assertEqual(len(self.cache), 3)
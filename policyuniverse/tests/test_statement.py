@@ -608,3 +608,55 @@ class StatementTestCase(unittest.TestCase):
 
         # AWS:userid with no *
         self.assertTrue(Statement(statement36).is_internet_accessible())
+
+    def test_statement_lazy_and_cached(self):
+        document = dict(
+            Effect="Allow",
+            Principal="*",
+            Action=["s3:get*"],
+            Resource=["arn:aws:s3:::bucket/*"],
+            Condition={"StringEquals": {"AWS:PrincipalOrgID": "o-abcdefghij"}},
+        )
+        statement = Statement(document)
+        self.assertFalse(hasattr(statement, "__dict__"))
+        self.assertFalse(hasattr(statement, "_cached_principals"))
+        self.assertEqual(statement.effect, "Allow")
+        self.assertFalse(hasattr(statement, "_cached_condition_entries"))
+
+        self.assertIs(statement.principals, statement.principals)
+        self.assertIsInstance(statement.principals, frozenset)
+        self.assertIsInstance(statement.actions, frozenset)
+        self.assertIs(statement.condition_entries, statement.condition_entries)
+        self.assertIsInstance(statement.condition_entries, tuple)
+        self.assertIs(statement.action_set, statement.action_set)
+        self.assertIs(statement.actions_expanded, statement.actions_expanded)
+        self.assertIs(statement.resources, statement.resources)
+        self.assertEqual(statement.resources, {"arn:aws:s3:::bucket/*"})
+        self.assertEqual(statement.condition_orgids, {"o-abcdefghij"})
+        self.assertEqual(statement.condition_cidrs, set())
+
+        summary = statement.action_summary()
+        summary["s3"].add("Write")
+        self.assertEqual(statement.action_summary(), {"s3": {"Read"}})
+        self.assertEqual(statement.action_summary()["ec2"], set())
+
+    def test_condition_operator_table(self):
+        from policyuniverse.statement import (
+            _CONDITION_OPERATORS,
+            _RELEVANT_CONDITION_OPERATORS,
+            _is_relevant_condition_operator,
+        )
+
+        for operator, relevant in _CONDITION_OPERATORS.items():
+            self.assertEqual(
+                relevant,
+                any(regex.match(operator) for regex in _RELEVANT_CONDITION_OPERATORS),
+                operator,
+            )
+        self.assertTrue(
+            _is_relevant_condition_operator("ForAnyValue:StringLikeIfExists")
+        )
+        self.assertFalse(_is_relevant_condition_operator("StringNotEquals"))
+        # Undocumented operators keep the old prefix-match behaviour.
+        self.assertTrue(_is_relevant_condition_operator("StringEqualsSomething"))
+        self.assertFalse(_is_relevant_condition_operator("NumericFoo"))
@@ -0,0 +1,140 @@
+#     Copyright 2018 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.tests.test_streaming
+    :platform: Unix
+
+.. version:: $$VERSION$$
+.. moduleauthor::  Patrick Kelley <patrickbarrettkelley@gmail.com> @patrickbkelley
+
+"""
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from policyuniverse.expander_minimizer import (
+    expand_minimize_over_policies,
+    expand_policy,
+)
+from policyuniverse.streaming import (
+    iter_authorization_details,
+    iter_ndjson_policies,
+    stream_over_policies,
+    write_ndjson,
+)
+
+POLICY_1 = {
+    "Version": "2012-10-17",
+    "Statement": [{"Effect": "Allow", "Action": "swf:res*", "Resource": "*"}],
+}
+POLICY_2 = {
+    "Statement": [
+        {
+            "Effect": "Allow",
+            "Action": ["s3:getobject"],
+            "Resource": ["*"],
+            "Size": 12345,
+        }
+    ]
+}
+
+DETAILS = {
+    "account": 123456789012,
+    "rolepolicies": {"role-a": POLICY_1, "role-b": POLICY_2},
+    "userpolicies": {},
+    "grouppolicies": {"group-a": POLICY_2},
+}
+
+
+class StreamingTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_iter_authorization_details(self):
+        text = json.dumps(DETAILS, indent=2)
+        for chunk_size in [1, 7, 1 << 16]:
+            policies = list(
+                iter_authorization_details(io.StringIO(text), chunk_size=chunk_size)
+            )
+            self.assertEqual(
+                policies,
+                [
+                    ("rolepolicies", "role-a", POLICY_1),
+                    ("rolepolicies", "role-b", POLICY_2),
+                    ("grouppolicies", "group-a", POLICY_2),
+                ],
+            )
+
+    def test_single_policy(self):
+        policies = list(
+            iter_authorization_details(io.StringIO(json.dumps(POLICY_2)), chunk_size=3)
+        )
+        self.assertEqual(policies, [(None, None, POLICY_2)])
+
+    def test_truncated(self):
+        text = json.dumps(DETAILS)[:-20]
+        with self.assertRaises(ValueError):
+            list(iter_authorization_details(io.StringIO(text), chunk_size=5))
+
+    def test_stream_matches_expand_minimize_over_policies(self):
+        path = os.path.join(self.directory, "details.json")
+        with open(path, "w") as fp:
+            json.dump(DETAILS, fp)
+
+        expected = expand_minimize_over_policies(DETAILS, expand_policy)
+        streamed = {}
+        for header, name, policy in stream_over_policies(path, expand_policy):
+            streamed.setdefault(header, {})[name] = policy
+        self.assertEqual(streamed["rolepolicies"], expected["rolepolicies"])
+
+    def test_utf8_names(self):
+        path = os.path.join(self.directory, "details.json")
+        with open(path, "w", encoding="utf-8") as fp:
+            json.dump({"rolepolicies": {"rôle-ü": POLICY_2}}, fp, ensure_ascii=False)
+
+        streamed = list(stream_over_policies(path, expand_policy))
+        self.assertEqual([name for _, name, _ in streamed], ["rôle-ü"])
+
+    def test_ndjson_round_trip(self):
+        path = os.path.join(self.directory, "details.json")
+        with open(path, "w") as fp:
+            json.dump(DETAILS, fp)
+
+        output = os.path.join(self.directory, "expanded.ndjson")
+        with open(output, "w") as fp:
+            results = stream_over_policies(path, expand_policy, shallow=True)
+            self.assertEqual(write_ndjson(results, fp), 3)
+
+        with open(output) as fp:
+            records = list(iter_ndjson_policies(fp))
+        self.assertEqual(
+            [(header, name) for header, name, _ in records],
+            [
+                ("rolepolicies", "role-a"),
+                ("rolepolicies", "role-b"),
+                ("grouppolicies", "group-a"),
+            ],
+        )
+        self.assertEqual(records[0][2], expand_policy(POLICY_1))
+
+        bare = io.StringIO(json.dumps(POLICY_1) + "\n\n" + json.dumps(POLICY_2) + "\n")
+        self.assertEqual(
+            list(iter_ndjson_policies(bare)), [(None, 1, POLICY_1), (None, 3, POLICY_2)]
+        )
@@ -0,0 +1,102 @@
+#     Copyright 2018 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.tests.test_wildcard
+    :platform: Unix
+
+.. version:: $$VERSION$$
+.. moduleauthor::  Patrick Kelley <patrickbarrettkelley@gmail.com> @patrickbkelley
+
+"""
+import unittest
+
+from policyuniverse.wildcard import (
+    EXACT,
+    PREFIX,
+    REGEX,
+    SUFFIX,
+    compile_wildcard,
+    compile_wildcards,
+    literal_prefix,
+    wildcard_match,
+)
+
+
+class WildcardTestCase(unittest.TestCase):
+    def test_shapes(self):
+        self.assertEqual(compile_wildcard("s3:getobject").kind, EXACT)
+        self.assertEqual(compile_wildcard("s3:get*").kind, PREFIX)
+        self.assertEqual(compile_wildcard("*").kind, PREFIX)
+        self.assertEqual(compile_wildcard("*object").kind, SUFFIX)
+        self.assertEqual(compile_wildcard("s3:*object").kind, REGEX)
+        self.assertEqual(compile_wildcard("s3:get?bject").kind, REGEX)
+        self.assertEqual(compile_wildcard("*object*").kind, REGEX)
+
+    def test_match(self):
+        cases = [
+            ("s3:getobject", "s3:getobject", True),
+            ("s3:getobject", "s3:getobjectacl", False),
+            ("s3:get*", "s3:getobject", True),
+            ("s3:get*", "s3:get", True),
+            ("s3:get*", "s3:putobject", False),
+            ("*object", "s3:getobject", True),
+            ("*object", "s3:getobjectacl", False),
+            ("s3:*object", "s3:getobject", True),
+            ("s3:*object", "sqs:getobject", False),
+            ("s3:get?bject", "s3:getobject", True),
+            ("s3:get?bject", "s3:getbject", False),
+            ("*", "", True),
+            ("arn:aws:s3:::bucket/*", "arn:aws:s3:::bucket/a/b", True),
+            ("arn:aws:s3:::bucket/*", "arn:aws:s3:::bucket2/a", False),
+            ("a.b", "axb", False),
+            ("iam:get[ru]*", "iam:getrole", False),
+            ("iam:get[ru]*", "iam:get[ru]le", True),
+        ]
+        for pattern, value, expected in cases:
+            self.assertEqual(wildcard_match(pattern, value), expected, (pattern, value))
+
+    def test_case(self):
+        self.assertFalse(wildcard_match("S3:Get*", "s3:getobject"))
+        self.assertTrue(wildcard_match("S3:Get*", "s3:getobject", ignore_case=True))
+        self.assertTrue(wildcard_match("s3:get*", "S3:GetObject", ignore_case=True))
+        self.assertTrue(wildcard_match("s3:*Object", "S3:GETOBJECT", ignore_case=True))
+
+    def test_compiled_once(self):
+        self.assertIs(
+            compile_wildcard("ec2:describe*"), compile_wildcard("ec2:describe*")
+        )
+
+    def test_literal_prefix(self):
+        self.assertEqual(literal_prefix("s3:get*"), "s3:get")
+        self.assertEqual(literal_prefix("s3:get?bject*"), "s3:get")
+        self.assertEqual(literal_prefix("*"), "")
+        self.assertEqual(literal_prefix("s3:getobject"), "s3:getobject")
+        self.assertEqual(compile_wildcard("*object").prefix, "")
+
+    def test_batch(self):
+        wildcards = compile_wildcards(
+            ["s3:getobject", "s3:list*", "*tagging", "sqs:?eceivemessage"]
+        )
+        self.assertTrue(wildcards.match("s3:getobject"))
+        self.assertTrue(wildcards.match("s3:listbucket"))
+        self.assertTrue(wildcards.match("s3:putobjecttagging"))
+        self.assertTrue(wildcards("sqs:receivemessage"))
+        self.assertFalse(wildcards.match("s3:getobjectacl"))
+        self.assertEqual(
+            wildcards.filter(["s3:listbucket", "s3:putobject"]), ["s3:listbucket"]
+        )
+        self.assertFalse(compile_wildcards(["s3:getobject"]).match("s3:get"))
+        self.assertTrue(
+            compile_wildcards(["S3:List*"], ignore_case=True).match("s3:listbucket")
+        )
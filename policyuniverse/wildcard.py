@@ -0,0 +1,204 @@
+#     Copyright 2018 Netflix, Inc.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+.. module: policyuniverse.wildcard
+    :platform: Unix
+
+.. version:: $$VERSION$$
+.. moduleauthor::  Patrick Kelley <patrickbarrettkelley@gmail.com> @patrickbkelley
+
+IAM wildcard matching.
+
+IAM patterns only know two wildcards: '*' matches any run of characters and
+'?' matches exactly one.  Everything else, including '[', is literal.  Unlike
+fnmatch, nothing here is case-normalized unless ignore_case is requested.
+"""
+import re
+
+from policyuniverse.common import LRUCache
+
+WILDCARD_CHARACTERS = "*?"
+
+EXACT = "exact"
+PREFIX = "prefix"
+SUFFIX = "suffix"
+REGEX = "regex"
+
+_compiled = LRUCache(maxsize=4096)
+
+
+def has_wildcard(pattern):
+    return "*" in pattern or "?" in pattern
+
+
+def literal_prefix(pattern):
+    """Returns the part of the pattern before its first wildcard."""
+    for index, character in enumerate(pattern):
+        if character in WILDCARD_CHARACTERS:
+            return pattern[:index]
+    return pattern
+
+
+def translate(pattern):
+    """Translates an IAM wildcard pattern to an (unanchored) regular expression."""
+    parts = []
+    for character in pattern:
+        if character == "*":
+            parts.append(".*")
+        elif character == "?":
+            parts.append(".")
+        else:
+            parts.append(re.escape(character))
+    return "".join(parts)
+
+
+class Wildcard(object):
+    """A compiled IAM wildcard pattern.
+
+    kind is the shape the pattern was recognised as: 'exact' (no wildcards),
+    'prefix' ('abc*'), 'suffix' ('*abc') or 'regex' for anything else.
+    literal is the fixed text of the exact, prefix and suffix shapes and
+    prefix is whatever comes before the first wildcard.
+    match(value) is the fastest test for that shape.
+    """
+
+    __slots__ = ("pattern", "kind", "literal", "prefix", "match", "ignore_case")
+
+    def __init__(self, pattern, ignore_case=False):
+        self.pattern = pattern
+        self.ignore_case = ignore_case
+        if ignore_case:
+            pattern = pattern.lower()
+
+        self.prefix = literal_prefix(pattern)
+        body = pattern.strip("*")
+        if not has_wildcard(pattern):
+            self.kind, self.literal = EXACT, pattern
+            match = _equals(pattern)
+        elif not has_wildcard(body) and pattern == body + "*":
+            self.kind, self.literal = PREFIX, body
+            match = _startswith(body)
+        elif not has_wildcard(body) and pattern == "*" + body:
+            self.kind, self.literal = SUFFIX, body
+            match = _endswith(body)
+        else:
+            self.kind, self.literal = REGEX, None
+            match = _fullmatch(re.compile(translate(pattern), re.DOTALL))
+
+        if ignore_case:
+            self.match = _lowered(match)
+        else:
+            self.match = match
+
+    def __call__(self, value):
+        return self.match(value)
+
+    def __repr__(self):
+        return "<Wildcard {!r} ({})>".format(self.pattern, self.kind)
+
+
+class WildcardSet(object):
+    """Many IAM wildcard patterns compiled into one matcher.
+
+    Patterns without wildcards are checked with a set lookup, the rest with a
+    single regular expression alternation.
+    """
+
+    __slots__ = ("patterns", "exact", "regex", "ignore_case")
+
+    def __init__(self, patterns, ignore_case=False):
+        self.patterns = tuple(patterns)
+        self.ignore_case = ignore_case
+        if ignore_case:
+            patterns = [pattern.lower() for pattern in self.patterns]
+
+        self.exact = frozenset(
+            pattern for pattern in patterns if not has_wildcard(pattern)
+        )
+        wildcards = sorted(
+            set(pattern for pattern in patterns if has_wildcard(pattern))
+        )
+        if wildcards:
+            self.regex = re.compile(
+                "(?:{})".format("|".join(translate(pattern) for pattern in wildcards)),
+                re.DOTALL,
+            )
+        else:
+            self.regex = None
+
+    def match(self, value):
+        if self.ignore_case:
+            value = value.lower()
+        if value in self.exact:
+            return True
+        return self.regex is not None and self.regex.fullmatch(value) is not None
+
+    __call__ = match
+
+    def filter(self, values):
+        """Returns the values matching any of the patterns."""
+        return [value for value in values if self.match(value)]
+
+
+def compile_wildcard(pattern, ignore_case=False):
+    """Returns the compiled Wildcard for a pattern, compiling it once."""
+    key = (pattern, ignore_case)
+    wildcard = _compiled.get(key)
+    if wildcard is None:
+        wildcard = Wildcard(pattern, ignore_case=ignore_case)
+        _compiled.put(key, wildcard)
+    return wildcard
+
+
+def compile_wildcards(patterns, ignore_case=False):
+    return WildcardSet(patterns, ignore_case=ignore_case)
+
+
+def wildcard_match(pattern, value, ignore_case=False):
+    return compile_wildcard(pattern, ignore_case=ignore_case).match(value)
+
+
+def _equals(literal):
+    def match(value):
+        return value == literal
+
+    return match
+
+
+def _startswith(prefix):
+    def match(value):
+        return value.startswith(prefix)
+
+    return match
+
+
+def _endswith(suffix):
+    def match(value):
+        return value.endswith(suffix)
+
+    return match
+
+
+def _fullmatch(regex):
+    def match(value):
+        return regex.fullmatch(value) is not None
+
+    return match
+
+
+def _lowered(match):
+    def lowered(value):
+        return match(value.lower())
+
+    return lowered